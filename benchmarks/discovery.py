@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+"""
+Times the relationship discovery functions of `drf_nested_resource.utils` on
+synthetic model graphs much larger than the test models.
+
+For each size, a graph is generated with a parent model and that many child
+models.  Each model has many concrete fields and many generic foreign keys.
+Every child relates to the parent through a foreign key, a many-to-many field
+or a generic relation.  A child of each kind is then looked up from the
+parent.  It is the one added last, so its relation is the furthest from the
+start of the parent's field lists.
+
+Each function is timed cold, after `utils.clear_relation_caches()`, and warm.
+Cold timings start from empty caches and new serializer classes.  Run from the
+root of the repository::
+
+    $ python -m benchmarks.discovery
+    $ python -m benchmarks.discovery --sizes 10,100,1000 --profile-dir profiles
+
+With `--profile-dir`, the cold runs of each function are profiled with
+cProfile.  A `.prof` file is written for each of them, to be read with
+`pstats` or a viewer such as snakeviz.
+"""
+import os
+import sys
+import random
+import cProfile
+import argparse
+from timeit import default_timer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.run import configure  # NOQA
+
+
+APP_LABEL = 'tests'
+KINDS = ('fk', 'm2m', 'gfk')
+
+
+def make_model(name, attrs):
+    from django.db import models
+
+    attrs = dict(attrs)
+    attrs['__module__'] = 'benchmarks.discovery'
+    attrs['Meta'] = type('Meta', (object,), {'app_label': APP_LABEL})
+    return type(name, (models.Model,), attrs)
+
+
+def build_model_graph(size, fields, virtual_fields, seed=0):
+    """
+    Return the parent model and, for each kind of relation, the last of the
+    `size` child models that relate to the parent through it.
+    """
+    from django.db import models
+
+    from drf_nested_resource.compat import GenericForeignKey, GenericRelation
+
+    rng = random.Random(seed)
+    prefix = 'Synthetic{0}x{1}x{2}'.format(size, fields, virtual_fields)
+    parent_name = '{0}Parent'.format(prefix)
+
+    children = []
+    last_children = {}
+    for index in range(size):
+        kind = KINDS[index % len(KINDS)]
+        attrs = dict(
+            ('field_{0}'.format(number), models.CharField(max_length=20))
+            for number in range(fields)
+        )
+        for number in range(virtual_fields):
+            ct_field = 'content_type_{0}'.format(number)
+            fk_field = 'object_id_{0}'.format(number)
+            attrs[ct_field] = models.ForeignKey(
+                'contenttypes.ContentType', related_name='+',
+            )
+            attrs[fk_field] = models.PositiveIntegerField()
+            attrs['object_{0}'.format(number)] = GenericForeignKey(ct_field, fk_field)
+        if children:
+            attrs['sibling'] = models.ForeignKey(
+                rng.choice(children), related_name='+',
+            )
+
+        related_name = 'children_{0}'.format(index)
+        if kind == 'fk':
+            attrs['parent'] = models.ForeignKey(
+                '{0}.{1}'.format(APP_LABEL, parent_name), related_name=related_name,
+            )
+        elif kind == 'm2m':
+            attrs['parents'] = models.ManyToManyField(
+                '{0}.{1}'.format(APP_LABEL, parent_name), related_name=related_name,
+            )
+
+        child = make_model('{0}Child{1}'.format(prefix, index), attrs)
+        children.append(child)
+        last_children[kind] = child
+
+    parent_attrs = dict(
+        ('field_{0}'.format(number), models.CharField(max_length=20))
+        for number in range(fields)
+    )
+    for index, child in enumerate(children):
+        if KINDS[index % len(KINDS)] == 'gfk':
+            parent_attrs['generic_children_{0}'.format(index)] = GenericRelation(
+                child,
+                content_type_field='content_type_0',
+                object_id_field='object_id_0',
+            )
+    parent = make_model(parent_name, parent_attrs)
+
+    return parent, last_children
+
+
+def make_serializer_class(model):
+    from rest_framework import serializers
+
+    meta = type('Meta', (object,), {'model': model})
+    return type(
+        '{0}Serializer'.format(model.__name__),
+        (serializers.ModelSerializer,),
+        {'Meta': meta},
+    )
+
+
+def get_benchmarked_functions(parent_model, child_model):
+    """
+    Return `(name, setup, func)` tuples, where `setup` is called before every
+    cold run and returns the arguments of `func`.
+    """
+    from drf_nested_resource import utils
+
+    def no_setup():
+        return ()
+
+    def find_parent_to_child_manager():
+        return utils.find_parent_to_child_manager(
+            parent_obj=parent_model(pk=1),
+            child_model=child_model,
+        )
+
+    functions = [
+        ('find_child_to_parent_accessor_name', no_setup, lambda: (
+            utils.find_child_to_parent_accessor_name(
+                parent_model=parent_model, child_model=child_model,
+            )
+        )),
+        ('compute_default_url_kwarg_for_parent', no_setup, lambda: (
+            utils.compute_default_url_kwarg_for_parent(
+                parent_model=parent_model, child_model=child_model,
+            )
+        )),
+        ('find_parent_to_child_manager', no_setup, find_parent_to_child_manager),
+    ]
+
+    accessor_name = utils.find_child_to_parent_accessor_name(
+        parent_model=parent_model, child_model=child_model,
+    )
+    serializer_class = make_serializer_class(child_model)
+    try:
+        utils.find_child_to_parent_serializer_field(serializer_class, accessor_name)
+    except Exception:
+        # The default serializer of a generic relation's child does not
+        # represent the relation.
+        pass
+    else:
+        functions.append((
+            'find_child_to_parent_serializer_field',
+            lambda: (make_serializer_class(child_model),),
+            lambda serializer_class: utils.find_child_to_parent_serializer_field(
+                serializer_class, accessor_name,
+            ),
+        ))
+    return functions
+
+
+def time_cold(setup, func, repeat, profiler=None):
+    from drf_nested_resource import utils
+
+    elapsed = 0.0
+    for _ in range(repeat):
+        utils.clear_relation_caches()
+        args = setup()
+        if profiler is not None:
+            profiler.enable()
+        start = default_timer()
+        func(*args)
+        elapsed += default_timer() - start
+        if profiler is not None:
+            profiler.disable()
+    return elapsed / repeat
+
+
+def time_warm(setup, func, number):
+    args = setup()
+    func(*args)
+    start = default_timer()
+    for _ in range(number):
+        func(*args)
+    return (default_timer() - start) / number
+
+
+def run(sizes, fields, virtual_fields, repeat, number, profile_dir):
+    print('{0:>6} {1:>6} {2:>7} {3:<5} {4:<38} {5:>11} {6:>9}'.format(
+        'models', 'fields', 'virtual', 'kind', 'function', 'cold us', 'warm us',
+    ))
+    for size in sizes:
+        parent_model, last_children = build_model_graph(size, fields, virtual_fields)
+        for kind in KINDS:
+            child_model = last_children.get(kind)
+            if child_model is None:
+                continue
+            for name, setup, func in get_benchmarked_functions(parent_model, child_model):
+                profiler = cProfile.Profile() if profile_dir else None
+                cold = time_cold(setup, func, repeat, profiler)
+                warm = time_warm(setup, func, number)
+                if profiler is not None:
+                    profiler.dump_stats(os.path.join(
+                        profile_dir, '{0}-{1}-{2}.prof'.format(size, kind, name),
+                    ))
+                print('{0:>6} {1:>6} {2:>7} {3:<5} {4:<38} {5:>11.1f} {6:>9.2f}'.format(
+                    size, fields, virtual_fields, kind, name,
+                    cold * 1e6, warm * 1e6,
+                ))
+                sys.stdout.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        '--sizes', default='10,100,500',
+        help='Comma separated numbers of child models in the generated graphs.',
+    )
+    parser.add_argument(
+        '--fields', type=int, default=50,
+        help='Number of concrete fields on every generated model.',
+    )
+    parser.add_argument(
+        '--virtual-fields', type=int, default=10,
+        help='Number of generic foreign keys on every generated child model.',
+    )
+    parser.add_argument(
+        '--repeat', type=int, default=20,
+        help='Number of cold runs of each function.',
+    )
+    parser.add_argument(
+        '--number', type=int, default=10000,
+        help='Number of warm runs of each function.',
+    )
+    parser.add_argument(
+        '--profile-dir', default=None,
+        help='Write cProfile output of the cold runs to this directory.',
+    )
+    args = parser.parse_args(argv)
+    if args.virtual_fields < 1:
+        parser.error('The generic relations need at least one virtual field.')
+
+    # The content types table is needed to build generic relation managers.
+    configure('sqlite')
+
+    if args.profile_dir and not os.path.isdir(args.profile_dir):
+        os.makedirs(args.profile_dir)
+
+    run(
+        sizes=[int(size) for size in args.sizes.split(',')],
+        fields=args.fields,
+        virtual_fields=args.virtual_fields,
+        repeat=args.repeat,
+        number=args.number,
+        profile_dir=args.profile_dir,
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,378 @@
+#!/usr/bin/env python
+"""
+Benchmarks the overhead of the nested views over plain views for each kind
+of relationship in `tests/models.py`, at several parent fan-outs.
+
+For each relationship, fan-out and action, the same number of requests is
+made to a nested view and to a plain view which filters the children with a
+hand written query.  Requests per second, queries per request and peak memory
+of a single request are reported.  Peak memory is measured with `tracemalloc`,
+so it is only reported on Python 3.
+
+Run from the root of the repository::
+
+    $ python -m benchmarks.run
+    $ python -m benchmarks.run --fanouts 10,1000,100000,1000000 --requests 20
+    $ python -m benchmarks.run --scenarios fk,gfk --output results.json
+
+SQLite is used by default.  To run against PostgreSQL, e.g. in a container::
+
+    $ docker run -d -p 5432:5432 -e POSTGRES_PASSWORD=bench postgres
+    $ BENCHMARK_DB_PASSWORD=bench python -m benchmarks.run --database postgresql
+
+`BENCHMARK_DB_NAME`, `BENCHMARK_DB_USER`, `BENCHMARK_DB_HOST`,
+`BENCHMARK_DB_PORT` and `BENCHMARK_DB_PASSWORD` configure the connection.
+Every table the benchmarks use is emptied before each fan-out.
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+from timeit import default_timer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def configure(database):
+    from django.conf import settings
+
+    if database == 'postgresql':
+        databases = {
+            'default': {
+                'ENGINE': 'django.db.backends.postgresql_psycopg2',
+                'NAME': os.environ.get('BENCHMARK_DB_NAME', 'postgres'),
+                'USER': os.environ.get('BENCHMARK_DB_USER', 'postgres'),
+                'PASSWORD': os.environ.get('BENCHMARK_DB_PASSWORD', ''),
+                'HOST': os.environ.get('BENCHMARK_DB_HOST', 'localhost'),
+                'PORT': os.environ.get('BENCHMARK_DB_PORT', '5432'),
+            }
+        }
+    else:
+        databases = {
+            'default': {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': os.path.join(tempfile.mkdtemp(), 'benchmarks.sqlite3'),
+            }
+        }
+
+    settings.configure(
+        DEBUG=False,
+        USE_TZ=True,
+        DATABASES=databases,
+        ROOT_URLCONF='benchmarks.urls',
+        INSTALLED_APPS=[
+            'django.contrib.auth',
+            'django.contrib.contenttypes',
+            'django.contrib.sites',
+            'drf_nested_resource',
+            'tests',
+        ],
+        SITE_ID=1,
+        ALLOWED_HOSTS=['*'],
+    )
+
+    import django
+    try:
+        django.setup()
+    except AttributeError:
+        pass
+
+    from django.core.management import call_command
+    if django.VERSION >= (1, 7):
+        call_command('migrate', interactive=False, verbosity=0)
+    else:
+        call_command('syncdb', interactive=False, verbosity=0)
+
+
+def get_peak_memory(func):
+    """
+    Return the peak memory allocated while calling `func`, in KiB, or `None`
+    without `tracemalloc`, as on Python 2.  The peak resident size of the
+    process is not a substitute, as it never goes down from one call to the
+    next.
+    """
+    try:
+        import tracemalloc
+    except ImportError:
+        func()
+        return None
+
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] // 1024
+    finally:
+        tracemalloc.stop()
+
+
+def get_tables(scenarios):
+    """
+    Return the tables of every model in `scenarios`, ordered so that no
+    table is emptied before the tables referencing it.
+    """
+    child_models = []
+    parent_models = []
+    for scenario in scenarios:
+        child_models.append(scenario.child_model)
+        parent_models.append(scenario.parent_model)
+
+    tables = []
+    for model in child_models + parent_models:
+        for field in model._meta.many_to_many:
+            tables.append(field.rel.through._meta.db_table)
+    for model in child_models + parent_models:
+        tables.append(model._meta.db_table)
+
+    ordered_tables = []
+    for table in tables:
+        if table not in ordered_tables:
+            ordered_tables.append(table)
+    return ordered_tables
+
+
+def empty_tables(scenarios):
+    from django.db import connection
+
+    cursor = connection.cursor()
+    for table in get_tables(scenarios):
+        cursor.execute('DELETE FROM {0}'.format(connection.ops.quote_name(table)))
+
+
+def insert_default_rows(model, count):
+    """
+    Insert `count` rows of `model` made of default values only.
+    """
+    from django.db import connection
+
+    cursor = connection.cursor()
+    cursor.executemany(
+        'INSERT INTO {0} DEFAULT VALUES'.format(
+            connection.ops.quote_name(model._meta.db_table),
+        ),
+        [()] * count,
+    )
+
+
+def bulk_create_children(model, count, batch_size=10000, **kwargs):
+    """
+    Create `count` instances of `model` and return their primary keys.
+    """
+    last_pk = model._default_manager.order_by('-pk').values_list('pk', flat=True).first()
+    if not kwargs and all(field.primary_key for field in model._meta.fields):
+        # `bulk_create` has no column to insert for models with only a
+        # primary key, and fails on SQLite.
+        insert_default_rows(model, count)
+    else:
+        for start in range(0, count, batch_size):
+            model._default_manager.bulk_create(
+                [model(**kwargs) for _ in range(min(batch_size, count - start))]
+            )
+    queryset = model._default_manager.all()
+    if last_pk is not None:
+        queryset = queryset.filter(pk__gt=last_pk)
+    return list(queryset.values_list('pk', flat=True))
+
+
+def link_many_to_many(field, source_pks, target_pks, batch_size=10000):
+    through = field.rel.through
+    source_attname = field.m2m_field_name() + '_id'
+    target_attname = field.m2m_reverse_field_name() + '_id'
+    pairs = [
+        (source_pk, target_pk)
+        for source_pk in source_pks
+        for target_pk in target_pks
+    ]
+    if field.rel.symmetrical and field.rel.to == field.model:
+        pairs.extend([(target_pk, source_pk) for source_pk, target_pk in pairs])
+    for start in range(0, len(pairs), batch_size):
+        through._default_manager.bulk_create([
+            through(**{source_attname: source_pk, target_attname: target_pk})
+            for source_pk, target_pk in pairs[start:start + batch_size]
+        ])
+
+
+def populate(scenario, fanout):
+    """
+    Create a parent with `fanout` children, and return the primary keys of
+    the parent and of one of its children.
+    """
+    from django.contrib.contenttypes.models import ContentType
+
+    from benchmarks.scenarios import get_generic_foreign_key
+
+    parent = scenario.parent_model._default_manager.create()
+
+    if scenario.kind == 'fk':
+        child_pks = bulk_create_children(
+            scenario.child_model, fanout, **{scenario.child_field: parent}
+        )
+    elif scenario.kind == 'gfk':
+        generic_foreign_key = get_generic_foreign_key(scenario)
+        child_pks = bulk_create_children(scenario.child_model, fanout, **{
+            generic_foreign_key.ct_field: ContentType.objects.get_for_model(
+                scenario.parent_model,
+            ),
+            generic_foreign_key.fk_field: parent.pk,
+        })
+    else:
+        child_pks = bulk_create_children(scenario.child_model, fanout)
+        child_field = scenario.child_model._meta.get_field_by_name(
+            scenario.child_field,
+        )[0]
+        if hasattr(child_field, 'field'):
+            # A reverse many-to-many relation.
+            link_many_to_many(child_field.field, [parent.pk], child_pks)
+        else:
+            link_many_to_many(child_field, child_pks, [parent.pk])
+
+    return parent.pk, child_pks[0]
+
+
+def make_request(client, action, url):
+    if action == 'create':
+        response = client.post(url, '{}', content_type='application/json')
+        expected_status = 201
+    else:
+        response = client.get(url)
+        expected_status = 200
+    if response.status_code != expected_status:
+        raise AssertionError('{0} {1} returned {2}: {3}'.format(
+            action, url, response.status_code, response.content,
+        ))
+
+
+def benchmark(client, action, url, requests):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    # Warm up, so that relationship discovery is not measured.
+    make_request(client, action, url)
+
+    with CaptureQueriesContext(connection) as context:
+        make_request(client, action, url)
+    queries = len(context.captured_queries)
+
+    peak_memory = get_peak_memory(lambda: make_request(client, action, url))
+
+    start = default_timer()
+    for _ in range(requests):
+        make_request(client, action, url)
+    elapsed = default_timer() - start
+
+    return {
+        'requests_per_second': requests / elapsed,
+        'queries_per_request': queries,
+        'peak_memory_kib': peak_memory,
+    }
+
+
+def run(scenarios, fanouts, actions, requests):
+    from django.core.urlresolvers import reverse
+    from django.test.client import Client
+
+    from benchmarks.scenarios import SCENARIOS
+    from benchmarks.urls import get_url_kwarg, register_scenarios
+
+    register_scenarios(scenarios)
+
+    client = Client()
+    results = []
+    for scenario in scenarios:
+        url_kwarg = get_url_kwarg(scenario)
+        for fanout in fanouts:
+            empty_tables(SCENARIOS)
+            parent_pk, child_pk = populate(scenario, fanout)
+
+            for action in actions:
+                if action not in scenario.actions:
+                    continue
+                for view in ('plain', 'nested'):
+                    url_name = '{0}-{1}-{2}'.format(
+                        view, scenario.name,
+                        'detail' if action == 'retrieve' else 'list',
+                    )
+                    kwargs = {url_kwarg: parent_pk}
+                    if action == 'retrieve':
+                        kwargs['pk'] = child_pk
+                    url = reverse(url_name, urlconf='benchmarks.urls', kwargs=kwargs)
+                    result = benchmark(client, action, url, requests)
+                    result.update({
+                        'scenario': scenario.name,
+                        'fanout': fanout,
+                        'action': action,
+                        'view': view,
+                    })
+                    results.append(result)
+                    print_result(result)
+    return results
+
+
+def print_header():
+    print('{0:<12} {1:>8} {2:<9} {3:<7} {4:>10} {5:>8} {6:>10}'.format(
+        'scenario', 'fan-out', 'action', 'view', 'req/s', 'queries', 'peak KiB',
+    ))
+
+
+def print_result(result):
+    peak_memory = result['peak_memory_kib']
+    print('{scenario:<12} {fanout:>8} {action:<9} {view:<7} '
+          '{requests_per_second:>10.1f} {queries_per_request:>8} '
+          '{peak_memory:>10}'.format(
+              peak_memory='-' if peak_memory is None else peak_memory,
+              **result))
+    sys.stdout.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        '--scenarios', default=None,
+        help='Comma separated relationship scenarios: fk, gfk, m2m-forward, '
+             'm2m-reverse, m2m-self.  Defaults to all of them.',
+    )
+    parser.add_argument(
+        '--fanouts', default='10,1000,100000',
+        help='Comma separated numbers of children of the parent.',
+    )
+    parser.add_argument(
+        '--actions', default='list,retrieve,create',
+        help='Comma separated actions: list, retrieve, create.',
+    )
+    parser.add_argument(
+        '--requests', type=int, default=50,
+        help='Number of timed requests for each measurement.',
+    )
+    parser.add_argument(
+        '--database', choices=('sqlite', 'postgresql'), default='sqlite',
+    )
+    parser.add_argument(
+        '--output', default=None,
+        help='Also write the results to this file as JSON.',
+    )
+    args = parser.parse_args(argv)
+
+    configure(args.database)
+
+    from benchmarks.scenarios import SCENARIOS, get_scenario
+
+    if args.scenarios:
+        scenarios = [get_scenario(name) for name in args.scenarios.split(',')]
+    else:
+        scenarios = SCENARIOS
+
+    print_header()
+    results = run(
+        scenarios=scenarios,
+        fanouts=[int(fanout) for fanout in args.fanouts.split(',')],
+        actions=args.actions.split(','),
+        requests=args.requests,
+    )
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(results, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
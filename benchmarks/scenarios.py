@@ -0,0 +1,70 @@
+import collections
+
+from tests.models import (
+    TargetModel,
+    ForeignKeySourceModel,
+    GenericForeignKeySourceModel,
+    ManyToManyTargetModel,
+    ManyToManySourceModel,
+    SelfReferencingManyToManyModel,
+)
+
+
+Scenario = collections.namedtuple('Scenario', [
+    'name',
+    'class_name',
+    'kind',
+    'parent_model',
+    'child_model',
+    # The field on the child model which references the parent, through
+    # which the plain views filter and link the children.
+    'child_field',
+    'actions',
+])
+
+
+ALL_ACTIONS = ('list', 'retrieve', 'create')
+
+SCENARIOS = (
+    Scenario(
+        'fk', 'ForeignKey', 'fk',
+        TargetModel, ForeignKeySourceModel, 'target', ALL_ACTIONS,
+    ),
+    # The default serializer of a generic relation's child does not
+    # represent the relation, so children cannot be created through it.
+    Scenario(
+        'gfk', 'GenericForeignKey', 'gfk',
+        TargetModel, GenericForeignKeySourceModel, 'object', ('list', 'retrieve'),
+    ),
+    Scenario(
+        'm2m-forward', 'ForwardManyToMany', 'm2m',
+        ManyToManyTargetModel, ManyToManySourceModel, 'targets', ALL_ACTIONS,
+    ),
+    Scenario(
+        'm2m-reverse', 'ReverseManyToMany', 'm2m',
+        ManyToManySourceModel, ManyToManyTargetModel, 'sources', ALL_ACTIONS,
+    ),
+    Scenario(
+        'm2m-self', 'SelfManyToMany', 'm2m',
+        SelfReferencingManyToManyModel, SelfReferencingManyToManyModel, 'targets',
+        ALL_ACTIONS,
+    ),
+)
+
+
+def get_scenario(name):
+    for scenario in SCENARIOS:
+        if scenario.name == name:
+            return scenario
+    raise KeyError(name)
+
+
+def get_generic_foreign_key(scenario):
+    """
+    Return the `GenericForeignKey` of a generic relation scenario.  It is a
+    virtual field, which `_meta.get_field_by_name` does not know about.
+    """
+    for field in scenario.child_model._meta.virtual_fields:
+        if field.name == scenario.child_field:
+            return field
+    raise KeyError(scenario.child_field)
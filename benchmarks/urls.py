@@ -0,0 +1,51 @@
+from django.core.urlresolvers import clear_url_caches
+
+from rest_framework.routers import SimpleRouter
+
+from drf_nested_resource.registry import relationships
+from drf_nested_resource.routers import NestedResourceRouter
+
+from benchmarks.views import make_nested_viewset, make_plain_viewset
+
+
+def get_url_kwarg(scenario):
+    return relationships.get(
+        parent_model=scenario.parent_model,
+        child_model=scenario.child_model,
+    ).url_kwarg
+
+
+urlpatterns = []
+
+# The names of the scenarios whose views are in `urlpatterns`.
+_registered_scenarios = set()
+
+
+def register_scenarios(scenarios):
+    """
+    Add the nested and plain views of `scenarios` to `urlpatterns`.  Only the
+    scenarios being benchmarked are registered, so that a scenario whose views
+    cannot be built does not prevent running the others.
+    """
+    nested_router = NestedResourceRouter()
+    plain_router = SimpleRouter()
+
+    for scenario in scenarios:
+        if scenario.name in _registered_scenarios:
+            continue
+        url_kwarg = get_url_kwarg(scenario)
+        prefix = '{0}/(?P<{1}>\\d+)/children'.format(scenario.name, url_kwarg)
+        nested_router.register(
+            'nested/' + prefix,
+            make_nested_viewset(scenario),
+            'nested-{0}'.format(scenario.name),
+        )
+        plain_router.register(
+            'plain/' + prefix,
+            make_plain_viewset(scenario, url_kwarg),
+            'plain-{0}'.format(scenario.name),
+        )
+        _registered_scenarios.add(scenario.name)
+
+    urlpatterns.extend(nested_router.urls + plain_router.urls)
+    clear_url_caches()
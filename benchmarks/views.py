@@ -0,0 +1,119 @@
+"""
+The nested views being benchmarked, and the plain views they are compared
+against.  The plain views filter the children with a hand written query and
+link created children to the parent directly, without checking that the
+parent exists.
+"""
+from django.contrib.contenttypes.models import ContentType
+
+from rest_framework import serializers, viewsets
+
+from drf_nested_resource.mixins import (
+    NestedResourceMixin,
+    ManyToManyNestedResourceMixin,
+)
+
+from benchmarks.scenarios import get_generic_foreign_key
+
+PAGE_SIZE = 100
+
+
+def make_nested_viewset(scenario):
+    bases = (NestedResourceMixin, viewsets.ModelViewSet)
+    if scenario.kind == 'm2m':
+        bases = (ManyToManyNestedResourceMixin,) + bases
+    return type(
+        'Nested{0}ViewSet'.format(scenario.class_name),
+        bases,
+        {
+            'parent_model': scenario.parent_model,
+            'model': scenario.child_model,
+            'paginate_by': PAGE_SIZE,
+        },
+    )
+
+
+class PlainChildViewSet(viewsets.ModelViewSet):
+    url_kwarg = None
+    paginate_by = PAGE_SIZE
+
+    def get_parent_pk(self):
+        return self.kwargs[self.url_kwarg]
+
+
+class PlainForeignKeyChildViewSet(PlainChildViewSet):
+    attname = None
+
+    def get_queryset(self):
+        return self.model._default_manager.filter(
+            **{self.attname: self.get_parent_pk()}
+        )
+
+    def pre_save(self, obj):
+        setattr(obj, self.attname, self.get_parent_pk())
+
+
+class PlainGenericChildViewSet(PlainChildViewSet):
+    parent_model = None
+    ct_field = None
+    fk_field = None
+
+    def get_queryset(self):
+        return self.model._default_manager.filter(**{
+            self.ct_field: ContentType.objects.get_for_model(self.parent_model),
+            self.fk_field: self.get_parent_pk(),
+        })
+
+
+class PlainManyToManyChildViewSet(PlainChildViewSet):
+    accessor_name = None
+
+    def get_queryset(self):
+        return self.model._default_manager.filter(
+            **{self.accessor_name: self.get_parent_pk()}
+        )
+
+    def post_save(self, obj, created=False):
+        if created:
+            getattr(obj, self.accessor_name).add(self.get_parent_pk())
+
+
+def make_plain_serializer_class(scenario):
+    read_only_fields = ()
+    # A generic foreign key is a virtual field, which is neither known to
+    # `get_field_by_name` nor represented by the default serializer.
+    if scenario.kind != 'gfk' and scenario.child_model._meta.get_field_by_name(scenario.child_field)[2]:
+        # The parent is set by the view.
+        read_only_fields = (scenario.child_field,)
+    meta = type('Meta', (object,), {
+        'model': scenario.child_model,
+        'read_only_fields': read_only_fields,
+    })
+    return type(
+        'Plain{0}Serializer'.format(scenario.class_name),
+        (serializers.ModelSerializer,),
+        {'Meta': meta},
+    )
+
+
+def make_plain_viewset(scenario, url_kwarg):
+    attrs = {
+        'model': scenario.child_model,
+        'serializer_class': make_plain_serializer_class(scenario),
+        'url_kwarg': url_kwarg,
+    }
+    if scenario.kind == 'fk':
+        base = PlainForeignKeyChildViewSet
+        attrs['attname'] = scenario.child_field + '_id'
+    elif scenario.kind == 'gfk':
+        base = PlainGenericChildViewSet
+        generic_foreign_key = get_generic_foreign_key(scenario)
+        attrs.update({
+            'parent_model': scenario.parent_model,
+            'ct_field': generic_foreign_key.ct_field,
+            'fk_field': generic_foreign_key.fk_field,
+        })
+    else:
+        base = PlainManyToManyChildViewSet
+        attrs['accessor_name'] = scenario.child_field
+    return type('Plain{0}ViewSet'.format(scenario.class_name), (base,), attrs)
@@ -1 +1,3 @@
 __version__ = '1.3.0'
+
+default_app_config = 'drf_nested_resource.apps.NestedResourceConfig'
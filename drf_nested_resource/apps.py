@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class NestedResourceConfig(AppConfig):
+    name = 'drf_nested_resource'
+    verbose_name = 'DRF Nested Resource'
+
+    def ready(self):
+        from drf_nested_resource.registry import relationships
+        relationships.autodiscover()
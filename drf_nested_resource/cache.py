@@ -0,0 +1,271 @@
+import copy
+import time
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+
+from django.db.models.signals import post_save, post_delete, m2m_changed
+
+from drf_nested_resource.compat import get_cache
+
+
+class LRUCacheBackend(object):
+    """
+    A bounded in-process cache which expires entries after `timeout` seconds
+    and evicts the least recently used entries once it holds `max_size`.
+    """
+    def __init__(self, max_size=1000, timeout=60):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                expires, value = self._entries.pop(key)
+            except KeyError:
+                return default
+            if expires < time.time():
+                return default
+            # Re-insert the entry to mark it as the most recently used.
+            self._entries[key] = (expires, value)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.time() + self.timeout, value)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_version(self, namespace):
+        return self._versions.get(namespace, 0)
+
+    def incr_version(self, namespace):
+        with self._lock:
+            self._versions[namespace] = self._versions.get(namespace, 0) + 1
+
+
+class DjangoCacheBackend(object):
+    """
+    Stores entries in one of the caches configured in the `CACHES` setting so
+    that they are shared between processes.  The versions returned by
+    `get_version` include a generation, which `clear` moves on from, so that
+    clearing does not touch the other entries of a shared cache.
+    """
+    def __init__(self, alias='default', timeout=60, key_prefix='drf_nested_resource'):
+        self.alias = alias
+        self.timeout = timeout
+        self.key_prefix = key_prefix
+
+    @property
+    def cache(self):
+        return get_cache(self.alias)
+
+    def make_key(self, key):
+        return '{0}:{1}'.format(self.key_prefix, key)
+
+    def get(self, key, default=None):
+        return self.cache.get(self.make_key(key), default)
+
+    def set(self, key, value):
+        self.cache.set(self.make_key(key), value, self.timeout)
+
+    def clear(self):
+        """
+        Discard every versioned entry by starting a new generation of
+        versions.  The cache may be shared, so it is not cleared itself.
+        """
+        self.incr_counter(self.make_key('generation'))
+
+    def get_version(self, namespace):
+        # The generation and the version of the namespace are fetched
+        # together, so versioning costs a single round trip to the cache.
+        generation_key = self.make_key('generation')
+        version_key = self.make_key('version:{0}'.format(namespace))
+        counters = self.cache.get_many([generation_key, version_key])
+        generation = counters.get(generation_key)
+        if generation is None:
+            generation = self.add_counter(generation_key)
+        version = counters.get(version_key)
+        if version is None:
+            version = self.add_counter(version_key)
+        return '{0}.{1}'.format(generation, version)
+
+    def incr_version(self, namespace):
+        self.incr_counter(self.make_key('version:{0}'.format(namespace)))
+
+    def add_counter(self, key):
+        # Start from the current time rather than zero so that a counter
+        # which was evicted never reuses the number of an older one.
+        self.cache.add(key, int(time.time() * 1000), None)
+        return self.cache.get(key)
+
+    def incr_counter(self, key):
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            self.add_counter(key)
+
+
+class ModelCache(object):
+    """
+    Caches values computed from instances of a model, keyed by lookup kwargs.
+    Every entry for a model is invalidated whenever one of the
+    `invalidating_signals` is sent for that model.
+    """
+    invalidating_signals = (post_save, post_delete)
+
+    def __init__(self, backend=None):
+        if backend is None:
+            backend = LRUCacheBackend()
+        self.backend = backend
+        self._watched_models = set()
+        self._lock = threading.Lock()
+
+    def get_namespace(self, model):
+        return '{0}.{1}'.format(
+            model._meta.app_label, model._meta.object_name.lower(),
+        )
+
+    def make_key(self, model, lookup_kwargs):
+        """
+        Return the key of the entry for `lookup_kwargs` in the current version
+        of `model`.  A value computed after making the key should be set
+        under that key, so it is discarded if `model` changes meanwhile.
+        """
+        self.watch(model)
+        namespace = self.get_namespace(model)
+        lookup = '&'.join(
+            '{0}={1}'.format(key, value)
+            for key, value in sorted(lookup_kwargs.items())
+        )
+        return '{0}:{1}:{2}'.format(
+            namespace,
+            self.backend.get_version(namespace),
+            hashlib.md5(lookup.encode('utf-8')).hexdigest(),
+        )
+
+    def watch(self, model):
+        """
+        Connect the signals which invalidate the entries for `model`.
+        """
+        if model in self._watched_models:
+            return
+        with self._lock:
+            if model in self._watched_models:
+                return
+            for signal in self.invalidating_signals:
+                signal.connect(
+                    self.handle_model_change,
+                    sender=model,
+                    weak=False,
+                    dispatch_uid='drf_nested_resource.cache.{0}.{1}'.format(
+                        id(self), self.get_namespace(model),
+                    ),
+                )
+            self._watched_models.add(model)
+
+    def handle_model_change(self, sender, **kwargs):
+        self.invalidate(sender)
+
+    def invalidate(self, model):
+        self.backend.incr_version(self.get_namespace(model))
+
+    def get(self, model, lookup_kwargs, default=None):
+        return self.get_by_key(self.make_key(model, lookup_kwargs), default)
+
+    def set(self, model, lookup_kwargs, value):
+        self.set_by_key(self.make_key(model, lookup_kwargs), value)
+
+    def get_by_key(self, key, default=None):
+        return self.backend.get(key, default)
+
+    def set_by_key(self, key, value):
+        self.backend.set(key, value)
+
+
+class ParentObjectCache(ModelCache):
+    """
+    Caches parent instances across requests.  Set an instance of this as
+    `parent_object_cache` on a nested view to skip the parent query for
+    parents which were recently fetched and have not changed since.
+
+    With the default in-process backend, changes made by other processes are
+    only seen once the entries expire, so use a `DjangoCacheBackend` when
+    running more than one process.
+    """
+    def get_by_key(self, key, default=None):
+        parent_obj = super(ParentObjectCache, self).get_by_key(key)
+        if parent_obj is None:
+            return default
+        # Hand out a copy so one request cannot modify another's instance.
+        return copy.copy(parent_obj)
+
+
+class MissingParentCache(ModelCache):
+    """
+    Remembers lookups for which no parent exists, so that repeated requests
+    for a missing parent are answered with a 404 without a query.  Set an
+    instance of this as `missing_parent_cache` on a nested view.
+
+    Entries are short lived and are all discarded whenever an instance of the
+    parent model is saved, which covers a parent being created with a
+    previously missing lookup value.
+    """
+    invalidating_signals = (post_save,)
+
+    def __init__(self, backend=None):
+        if backend is None:
+            backend = LRUCacheBackend(max_size=10000, timeout=5)
+        super(MissingParentCache, self).__init__(backend=backend)
+
+    def is_missing(self, model, lookup_kwargs):
+        return bool(self.get(model, lookup_kwargs))
+
+    def set_missing(self, model, lookup_kwargs):
+        self.set(model, lookup_kwargs, True)
+
+
+class ChildAggregateCache(ModelCache):
+    """
+    Caches the count and aggregates of the children of each parent.  Set an
+    instance of this as `child_aggregate_cache` on a view using
+    `AggregateNestedResourceMixin`.
+
+    Every entry for a child model is discarded whenever an instance of it is
+    saved or deleted, or when one of its many-to-many relationships changes.
+    """
+    def watch(self, model):
+        if model in self._watched_models:
+            return
+        super(ChildAggregateCache, self).watch(model)
+
+        opts = model._meta
+        through_models = set(field.rel.through for field in opts.many_to_many)
+        through_models.update(
+            rel.field.rel.through
+            for rel in opts.get_all_related_many_to_many_objects()
+        )
+        for through in through_models:
+            m2m_changed.connect(
+                functools.partial(self.handle_m2m_change, watched_model=model),
+                sender=through,
+                weak=False,
+                dispatch_uid='drf_nested_resource.cache.{0}.{1}.{2}'.format(
+                    id(self), self.get_namespace(model), self.get_namespace(through),
+                ),
+            )
+
+    def handle_m2m_change(self, sender, watched_model, **kwargs):
+        # `m2m_changed` sends its own `model` argument, which is the model of
+        # the instances being added or removed.
+        if kwargs.get('action', '').startswith('post_'):
+            self.invalidate(watched_model)
@@ -18,3 +18,23 @@ try:
     singular_noun = engine.singular_noun
 except ImportError:
     singular_noun = dumb_singular_noun
+
+try:
+    from django.core.cache import caches
+
+    def get_cache(alias):
+        return caches[alias]
+except ImportError:
+    from django.core.cache import get_cache  # NOQA
+
+
+def queries_logged(connection):
+    """
+    Whether `connection` currently records its queries in `connection.queries`.
+    """
+    try:
+        return connection.queries_logged
+    except AttributeError:
+        from django.conf import settings
+        use_debug_cursor = connection.use_debug_cursor
+        return bool(use_debug_cursor or (use_debug_cursor is None and settings.DEBUG))
@@ -0,0 +1,225 @@
+import contextlib
+import collections
+from timeit import default_timer
+
+from django.db import connection as default_connection
+from django.db.models.query import QuerySet
+from django.dispatch import Signal
+
+from drf_nested_resource.compat import queries_logged
+
+
+# Sent at the end of every request to a view using
+# `InstrumentedNestedResourceMixin`, with the `PhaseTimer` of the request.
+nested_request_timed = Signal(providing_args=['view', 'request', 'timer'])
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class PhaseTimer(object):
+    """
+    Records the time and number of queries spent in each phase of a request.
+
+    Phases may be nested; the time and queries of a nested phase are only
+    counted against the innermost phase.  Queries are only counted while the
+    connection records them, e.g. when `DEBUG` is on, otherwise they are
+    `None`.
+    """
+    def __init__(self, connection=None):
+        self.connection = connection or default_connection
+        self.timings = collections.OrderedDict()
+        self._stack = []
+
+    def get_query_count(self):
+        if not queries_logged(self.connection):
+            return None
+        return len(self.connection.queries)
+
+    @contextlib.contextmanager
+    def record(self, phase):
+        # start time, start query count, time and queries of nested phases
+        frame = [default_timer(), self.get_query_count(), 0.0, 0]
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            duration = default_timer() - frame[0]
+            end_query_count = self.get_query_count()
+            if frame[1] is None or end_query_count is None:
+                queries = None
+            else:
+                queries = end_query_count - frame[1]
+
+            timing = self.timings.setdefault(phase, {'duration': 0.0, 'queries': 0})
+            timing['duration'] += duration - frame[2]
+            if queries is None or timing['queries'] is None:
+                timing['queries'] = None
+            else:
+                timing['queries'] += queries - frame[3]
+
+            if self._stack:
+                self._stack[-1][2] += duration
+                if queries is not None:
+                    self._stack[-1][3] += queries
+
+    @property
+    def total_duration(self):
+        return sum(timing['duration'] for timing in self.timings.values())
+
+    @property
+    def total_queries(self):
+        queries = [timing['queries'] for timing in self.timings.values()]
+        if None in queries:
+            return None
+        return sum(queries)
+
+    def get_server_timing(self):
+        """
+        Return the timings as the value of a `Server-Timing` header, in
+        milliseconds.
+        """
+        return ', '.join(
+            '{0};dur={1:.3f}'.format(phase, timing['duration'] * 1000)
+            for phase, timing in self.timings.items()
+        )
+
+
+class InstrumentedNestedResourceMixin(object):
+    """
+    Records the time and queries spent in each part of the nesting layer for
+    every request, so they can be told apart from the view's own work:
+
+    - `parent`: looking up the parent (`get_parent_object`,
+      `check_parent_exists`, `start_parent_check`, `wait_for_parent_check`).
+    - `relationship`: discovering the relationship between the models and
+      the serializer (`get_parent_relationship`, `get_ancestor_lookups`,
+      `get_parent_serializer_field_name`, `get_child_related_lookups`).
+    - `serializer`: constructing the serializer (`get_serializer`).
+    - `queryset`: building the child queryset and evaluating a page of it
+      (`get_queryset`, `paginate_queryset`).
+    - `children`: evaluating an unpaginated child queryset before it is
+      serialized, and fetching the child of a detail request (`get_object`).
+    - `view`: everything else.
+
+    The `PhaseTimer` of the request is sent with the `nested_request_timed`
+    signal.  Set `server_timing` to add a `Server-Timing` header to the
+    response, and `query_budget` to raise `QueryBudgetExceeded` when a request
+    makes more queries than that, which is meant for tests.
+
+    Must be used together with `NestedResourceMixin`, before it.
+    """
+    server_timing = False
+    query_budget = None
+
+    nested_timer = None
+
+    def dispatch(self, request, *args, **kwargs):
+        self.nested_timer = PhaseTimer()
+        connection = self.nested_timer.connection
+
+        if self.query_budget is not None:
+            # Queries are only counted when the connection records them.
+            use_debug_cursor = connection.use_debug_cursor
+            connection.use_debug_cursor = True
+        try:
+            with self.nested_timer.record('view'):
+                response = super(InstrumentedNestedResourceMixin, self).dispatch(
+                    request, *args, **kwargs
+                )
+        finally:
+            if self.query_budget is not None:
+                connection.use_debug_cursor = use_debug_cursor
+
+        nested_request_timed.send(
+            sender=self.__class__,
+            view=self,
+            request=request,
+            timer=self.nested_timer,
+        )
+        if self.server_timing:
+            response['Server-Timing'] = self.nested_timer.get_server_timing()
+        if self.query_budget is not None:
+            self.check_query_budget(self.nested_timer)
+        return response
+
+    def check_query_budget(self, timer):
+        if timer.total_queries > self.query_budget:
+            raise QueryBudgetExceeded(
+                "{0} made {1} queries, over its budget of {2}: {3}".format(
+                    self.__class__.__name__,
+                    timer.total_queries,
+                    self.query_budget,
+                    ', '.join(
+                        '{0}={1}'.format(phase, timing['queries'])
+                        for phase, timing in timer.timings.items()
+                    ),
+                )
+            )
+
+    def record_phase(self, phase):
+        if self.nested_timer is None:
+            return _null_context()
+        return self.nested_timer.record(phase)
+
+    def get_parent_object(self):
+        with self.record_phase('parent'):
+            return super(InstrumentedNestedResourceMixin, self).get_parent_object()
+
+    def check_parent_exists(self):
+        with self.record_phase('parent'):
+            return super(InstrumentedNestedResourceMixin, self).check_parent_exists()
+
+    def start_parent_check(self):
+        with self.record_phase('parent'):
+            return super(InstrumentedNestedResourceMixin, self).start_parent_check()
+
+    def wait_for_parent_check(self):
+        with self.record_phase('parent'):
+            return super(InstrumentedNestedResourceMixin, self).wait_for_parent_check()
+
+    def get_parent_relationship(self):
+        with self.record_phase('relationship'):
+            return super(InstrumentedNestedResourceMixin, self).get_parent_relationship()
+
+    def get_ancestor_lookups(self):
+        with self.record_phase('relationship'):
+            return super(InstrumentedNestedResourceMixin, self).get_ancestor_lookups()
+
+    def get_parent_serializer_field_name(self):
+        with self.record_phase('relationship'):
+            return super(InstrumentedNestedResourceMixin, self).get_parent_serializer_field_name()
+
+    def get_child_related_lookups(self):
+        with self.record_phase('relationship'):
+            return super(InstrumentedNestedResourceMixin, self).get_child_related_lookups()
+
+    def get_serializer(self, instance=None, *args, **kwargs):
+        if kwargs.get('many') and isinstance(instance, QuerySet):
+            # Otherwise the children would only be fetched while the
+            # serializer's data is built, in the `view` phase.
+            with self.record_phase('children'):
+                len(instance)
+        with self.record_phase('serializer'):
+            return super(InstrumentedNestedResourceMixin, self).get_serializer(
+                instance, *args, **kwargs
+            )
+
+    def get_object(self, *args, **kwargs):
+        with self.record_phase('children'):
+            return super(InstrumentedNestedResourceMixin, self).get_object(*args, **kwargs)
+
+    def get_queryset(self):
+        with self.record_phase('queryset'):
+            return super(InstrumentedNestedResourceMixin, self).get_queryset()
+
+    def paginate_queryset(self, *args, **kwargs):
+        with self.record_phase('queryset'):
+            return super(InstrumentedNestedResourceMixin, self).paginate_queryset(*args, **kwargs)
+
+
+@contextlib.contextmanager
+def _null_context():
+    yield
@@ -1,12 +1,145 @@
 import copy
+import hashlib
 import collections
+import itertools
+import json
+import threading
+from calendar import timegm
 
-from django.core.exceptions import ImproperlyConfigured
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.db import connections, transaction
+from django.db.models import Count, Max
+from django.db.models.fields import FieldDoesNotExist
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from django.utils import six
+from django.utils.six.moves import queue
 
-from rest_framework import exceptions
+from rest_framework import exceptions, generics, permissions, status
+from rest_framework.response import Response
+from rest_framework.utils import encoders
 
 from drf_nested_resource import utils
+from drf_nested_resource.registry import relationships
+
+
+# Load the parent instance and use its related manager to find the children.
+PARENT_LOOKUP_FETCH = 'fetch'
+# Only check that the parent exists and filter the children directly.
+PARENT_LOOKUP_EXISTS = 'exists'
+# Filter the children directly and only check that the parent exists when no
+# children are found.
+PARENT_LOOKUP_JOIN = 'join'
+# Filter the children directly while checking that the parent exists in a
+# separate thread and connection.
+PARENT_LOOKUP_CONCURRENT = 'concurrent'
+
+
+def _can_query_concurrently(alias):
+    """
+    Whether a query on another connection to the database `alias` sees the
+    same data as this thread's connection.
+    """
+    connection = connections[alias]
+    if connection.in_atomic_block:
+        # Another connection would not see the uncommitted changes.
+        return False
+    if connection.vendor == 'sqlite':
+        name = connection.settings_dict['NAME']
+        if not name or name == ':memory:' or 'mode=memory' in name:
+            # Every connection to an in-memory database has its own database.
+            return False
+    return True
+
+
+class ParentCheckPool(object):
+    """
+    A few long-lived threads which run `ParentExistsCheck`s.  The threads are
+    started as checks are submitted, up to `size` of them, which defaults to
+    the `DRF_NESTED_RESOURCE_PARENT_CHECK_THREADS` setting.  When every thread
+    already has a check waiting for it, further checks are refused, so the
+    caller can run them right away instead of queueing behind the others.
+
+    As at the end of a request, each thread closes its database connections
+    after a check if they are unusable or older than `CONN_MAX_AGE`, and
+    otherwise keeps them open for the next check.
+    """
+    def __init__(self, size=None):
+        self.size = size
+        self.checks = queue.Queue()
+        self.threads = []
+        self.lock = threading.Lock()
+
+    def get_size(self):
+        if self.size is not None:
+            return self.size
+        return getattr(settings, 'DRF_NESTED_RESOURCE_PARENT_CHECK_THREADS', 4)
+
+    def submit(self, check):
+        """
+        Queue `check` to be run by one of the threads, returning whether it
+        was accepted.
+        """
+        size = self.get_size()
+        with self.lock:
+            if self.checks.qsize() >= size:
+                return False
+            if len(self.threads) < size:
+                thread = threading.Thread(target=self.work)
+                thread.daemon = True
+                thread.start()
+                self.threads.append(thread)
+            self.checks.put(check)
+        return True
+
+    def work(self):
+        while True:
+            check = self.checks.get()
+            try:
+                check.run()
+            finally:
+                for connection in connections.all():
+                    connection.close_if_unusable_or_obsolete()
+
+
+parent_check_pool = ParentCheckPool()
+
+
+class ParentExistsCheck(object):
+    """
+    Runs `queryset.exists()` on a thread of `pool`, by default the shared
+    `parent_check_pool`, and so on a separate database connection.  If the
+    pool is backed up, the query is run right away on the current thread.
+    """
+    def __init__(self, queryset, pool=None):
+        self.queryset = queryset
+        self.pool = pool
+        self.exists = None
+        self.error = None
+        self.done = threading.Event()
+
+    def start(self):
+        if not (self.pool or parent_check_pool).submit(self):
+            self.run()
+
+    def run(self):
+        try:
+            self.exists = self.queryset.exists()
+        except Exception as error:
+            self.error = error
+        finally:
+            self.done.set()
+
+    def wait(self):
+        """
+        Wait for the query to finish and return its result.
+        """
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.exists
 
 
 class NestedResourceMixin(object):
@@ -14,12 +147,43 @@ class NestedResourceMixin(object):
     Allows to use nested resource url and pass the url kwars for parent object lookup to the serializer
     This enforce a proper use of the serializer for db integrity constraints
     For many-to-many relationships, it must only be used for read only endpoints
+    unless it is combined with `ManyToManyNestedResourceMixin`
+
+    For deeper nesting, set `ancestor_models` to the models above
+    `parent_model`, starting with the parent's own parent.  The whole chain is
+    then checked in the same query as the parent.
+
+    Set `parent_lookup_strategy` to `PARENT_LOOKUP_EXISTS` to only check that
+    the parent exists when reading, rather than loading the parent instance,
+    or to `PARENT_LOOKUP_JOIN` to read the children in a single query and only
+    check the parent when there are no children.  `PARENT_LOOKUP_CONCURRENT`
+    checks the parent on another connection while the children are read, and
+    replaces the response with a 404 if the parent does not exist.  It falls
+    back to checking the parent first inside a transaction, as the other
+    connection would not see its changes.
     """
     _parent_lookup_field = None
     _parent_url_kwarg = None
     _parent_serializer_field = None
+    _parent_object_memo = None
+    _parent_exists_memo = None
+    _parent_check = None
 
     parent_to_child_manager_attr = None
+    parent_lookup_strategy = PARENT_LOOKUP_FETCH
+
+    ancestor_models = ()
+    ancestor_url_kwargs = None
+
+    # The `select_related` and `prefetch_related` lookups for the children.
+    # By default they are worked out from the serializer.
+    child_select_related = None
+    child_prefetch_related = None
+
+    # An optional `drf_nested_resource.cache.ParentObjectCache`.
+    parent_object_cache = None
+    # An optional `drf_nested_resource.cache.MissingParentCache`.
+    missing_parent_cache = None
 
     default_error_messages = {
         "parent_reference_mismatch": "The reference value for the parent model (`{key}: {value}`) does not match that of the parent instance (`{parent_reference_value}`) for the parent instance designated by this url",
@@ -28,9 +192,10 @@ class NestedResourceMixin(object):
     #
     # Core Serializer methods.
     #
-    def get_parent_object(self):
+    def get_parent_lookup_kwargs(self):
         """
-        Returns the instance of `self.parent_model` as designated by the url.
+        Returns the lookup kwargs for `self.parent_model` as designated by the
+        url.
         """
         try:
             parent_lookup_value = self.kwargs[self.parent_url_kwarg]
@@ -40,10 +205,175 @@ class NestedResourceMixin(object):
                 "you have used for your url, please set `parent_url_kwarg` on "
                 "your view to overide this value".format(self.parent_url_kwarg)
             )
-        return get_object_or_404(
-            self.parent_model,
-            **{self.parent_lookup_field: parent_lookup_value}
-        )
+        lookup_kwargs = {self.parent_lookup_field: parent_lookup_value}
+
+        for url_kwarg, lookup in self.get_ancestor_lookups():
+            try:
+                lookup_kwargs[lookup] = self.kwargs[url_kwarg]
+            except KeyError:
+                raise ImproperlyConfigured(
+                    "'{0}' not found in the URL kwargs.  If this is not the "
+                    "value you have used for your url, please set "
+                    "`ancestor_url_kwargs` on your view to overide this "
+                    "value".format(url_kwarg)
+                )
+        return lookup_kwargs
+
+    def get_parent_object(self):
+        """
+        Returns the instance of `self.parent_model` as designated by the url.
+
+        The instance is remembered for the remainder of the request so that it
+        is only fetched once, unless the url kwargs change.  If
+        `parent_object_cache` is set, it is also shared between requests.
+        """
+        lookup_kwargs = self.get_parent_lookup_kwargs()
+        cache_key = sorted(lookup_kwargs.items())
+
+        if self._parent_object_memo is not None:
+            cached_key, parent_obj = self._parent_object_memo
+            if cached_key == cache_key:
+                return parent_obj
+
+        parent_obj = None
+        if self.parent_object_cache is not None:
+            parent_cache_key = self.parent_object_cache.make_key(
+                self.parent_model, lookup_kwargs,
+            )
+            parent_obj = self.parent_object_cache.get_by_key(parent_cache_key)
+
+        if parent_obj is None:
+            self.check_parent_not_known_missing(lookup_kwargs)
+            try:
+                parent_obj = get_object_or_404(self.parent_model, **lookup_kwargs)
+            except Http404:
+                if self.missing_parent_cache is not None:
+                    self.missing_parent_cache.set_missing(
+                        self.parent_model, lookup_kwargs,
+                    )
+                raise
+            if self.parent_object_cache is not None:
+                self.parent_object_cache.set_by_key(parent_cache_key, parent_obj)
+
+        self._parent_object_memo = (cache_key, parent_obj)
+        return parent_obj
+
+    def check_parent_exists(self):
+        """
+        Raises `Http404` if the instance of `self.parent_model` designated by
+        the url does not exist, without loading the instance.
+        """
+        lookup_kwargs = self.get_parent_lookup_kwargs()
+        if self.is_parent_known_to_exist(lookup_kwargs):
+            return
+
+        self.check_parent_not_known_missing(lookup_kwargs)
+        queryset = self.parent_model._default_manager.filter(**lookup_kwargs)
+        self.record_parent_exists(lookup_kwargs, queryset.exists())
+
+    def is_parent_known_to_exist(self, lookup_kwargs):
+        """
+        Whether the parent designated by `lookup_kwargs` was already found
+        during this request or is in the `parent_object_cache`.
+        """
+        cache_key = sorted(lookup_kwargs.items())
+
+        if self._parent_exists_memo == cache_key:
+            return True
+        if self._parent_object_memo is not None:
+            if self._parent_object_memo[0] == cache_key:
+                return True
+        if self.parent_object_cache is not None:
+            if self.parent_object_cache.get(self.parent_model, lookup_kwargs) is not None:
+                self._parent_exists_memo = cache_key
+                return True
+        return False
+
+    def record_parent_exists(self, lookup_kwargs, exists):
+        """
+        Remember whether the parent designated by `lookup_kwargs` exists,
+        raising `Http404` if it does not.
+        """
+        if not exists:
+            if self.missing_parent_cache is not None:
+                self.missing_parent_cache.set_missing(
+                    self.parent_model, lookup_kwargs,
+                )
+            raise Http404(
+                'No {0} matches the given query.'.format(
+                    self.parent_model._meta.object_name,
+                )
+            )
+        self._parent_exists_memo = sorted(lookup_kwargs.items())
+
+    def start_parent_check(self):
+        """
+        Start checking that the parent exists on another connection, to be
+        finished by `wait_for_parent_check`.  The parent is checked right away
+        when another connection would not see the same data.
+        """
+        if self._parent_check is not None:
+            return
+        lookup_kwargs = self.get_parent_lookup_kwargs()
+        if self.is_parent_known_to_exist(lookup_kwargs):
+            return
+
+        self.check_parent_not_known_missing(lookup_kwargs)
+        queryset = self.parent_model._default_manager.filter(**lookup_kwargs)
+        if not _can_query_concurrently(queryset.db):
+            self.record_parent_exists(lookup_kwargs, queryset.exists())
+            return
+
+        check = ParentExistsCheck(queryset)
+        check.start()
+        self._parent_check = (lookup_kwargs, check)
+
+    def wait_for_parent_check(self):
+        """
+        Finish the check started by `start_parent_check`, raising `Http404` if
+        the parent does not exist.
+        """
+        if self._parent_check is None:
+            return
+        lookup_kwargs, check = self._parent_check
+        self._parent_check = None
+        self.record_parent_exists(lookup_kwargs, check.wait())
+
+    def check_parent_not_known_missing(self, lookup_kwargs):
+        """
+        Raises `Http404` if `missing_parent_cache` recently found that no
+        parent matches `lookup_kwargs`.
+        """
+        if self.missing_parent_cache is None:
+            return
+        if self.missing_parent_cache.is_missing(self.parent_model, lookup_kwargs):
+            raise Http404(
+                'No {0} matches the given query.'.format(
+                    self.parent_model._meta.object_name,
+                )
+            )
+
+    def handle_bulk_write(self):
+        """
+        Called after the children were written to with `bulk_create` or
+        `QuerySet.update`, which do not send the model signals that anything
+        derived from the children would otherwise be refreshed by.
+        """
+
+    def verify_parent_for_empty_result(self, object_list):
+        """
+        When using `PARENT_LOOKUP_JOIN` the child queryset is not checked
+        against the parent, so an empty result may mean the parent does not
+        exist.  Only in that case is the cheap existence check performed.
+        With `PARENT_LOOKUP_CONCURRENT`, an empty result waits for the check
+        already running.
+        """
+        if self.parent_lookup_strategy == PARENT_LOOKUP_JOIN:
+            if not object_list:
+                self.check_parent_exists()
+        elif self.parent_lookup_strategy == PARENT_LOOKUP_CONCURRENT:
+            if not object_list:
+                self.wait_for_parent_check()
 
     def get_serializer(self, instance=None, data=None,
                        files=None, many=False, partial=False):
@@ -52,12 +382,42 @@ class NestedResourceMixin(object):
         child object is associated with the parent_object for `create/update`
         style operations.
         """
-        parent_obj = self.get_parent_object()
+        if data is not None:
+            parent_obj = self.get_parent_object()
+
+            if isinstance(data, (list, tuple)):
+                data = [
+                    self.add_parent_reference(item, parent_obj)
+                    for item in data
+                ]
+            else:
+                data = self.add_parent_reference(data, parent_obj)
+
+        if many and instance is not None:
+            self.verify_parent_for_empty_result(instance)
+
+        serializer = super(NestedResourceMixin, self).get_serializer(
+            instance=instance,
+            data=data,
+            files=files,
+            many=many,
+            partial=partial,
+        )
+        return serializer
 
-        if data is not None and self.parent_serializer_field in data:
-            # Casting to a string because everything that comes out of the post
-            # data is a string.
-            if not data[self.parent_serializer_field] == str(getattr(parent_obj, self.parent_lookup_field)):
+    def add_parent_reference(self, data, parent_obj):
+        """
+        Ensure the data for a single child references `parent_obj`, raising
+        `ParseError` if it references a different parent.  Anything other
+        than a mapping is returned unchanged, for the serializer to reject.
+        """
+        if not isinstance(data, collections.Mapping):
+            return data
+
+        if self.parent_serializer_field in data:
+            # Casting to a string because everything that comes out of the
+            # post data is a string.
+            if not str(data[self.parent_serializer_field]) == str(getattr(parent_obj, self.parent_lookup_field)):
                 raise exceptions.ParseError(
                     self.default_error_messages['parent_reference_mismatch'].format(
                         key=data.get(self.parent_serializer_field),
@@ -66,42 +426,191 @@ class NestedResourceMixin(object):
                     )
                 )
 
-        if isinstance(data, collections.Mapping):
+        if self.parent_serializer_field not in data:
             # In the case where data is being posted in that does not include
             # the value to tie the object to it's parent, set it gracefully.
-            data = copy.deepcopy(data)
+            # Only a top level key is added, so a shallow copy is enough to
+            # leave the original data untouched (for a `QueryDict` this also
+            # gives a mutable copy).
+            data = copy.copy(data)
             data.setdefault(self.parent_serializer_field, parent_obj.pk)
-
-        serializer = super(NestedResourceMixin, self).get_serializer(
-            instance=instance,
-            data=data,
-            files=files,
-            many=many,
-            partial=partial,
-        )
-        return serializer
+        return data
 
     def get_queryset(self):
         """
         Return a queryset of `self.model` objects that are related to the
         parent object.
         """
-        parent_obj = self.get_parent_object()
-        manager = self.get_parent_to_child_manager(parent_obj)
-        return manager.all()
+        if self.parent_lookup_strategy == PARENT_LOOKUP_EXISTS:
+            self.check_parent_exists()
+            queryset = self.get_child_queryset()
+        elif self.parent_lookup_strategy == PARENT_LOOKUP_JOIN:
+            queryset = self.get_child_queryset()
+        elif self.parent_lookup_strategy == PARENT_LOOKUP_CONCURRENT:
+            self.start_parent_check()
+            queryset = self.get_child_queryset()
+        else:
+            parent_obj = self.get_parent_object()
+            manager = self.get_parent_to_child_manager(parent_obj)
+            queryset = self.get_parent_relationship().attach_parent(
+                manager.all(), parent_obj, self.parent_to_child_manager_attr,
+            )
+        return self.optimize_child_queryset(queryset)
+
+    def get_child_related_lookups(self):
+        """
+        Return the `(select_related, prefetch_related)` lookups to apply to
+        the child queryset.
+        """
+        select_related = self.child_select_related
+        prefetch_related = self.child_prefetch_related
+        if select_related is None or prefetch_related is None:
+            default_select_related, default_prefetch_related = self.get_default_child_related_lookups()
+            if select_related is None:
+                select_related = default_select_related
+            if prefetch_related is None:
+                prefetch_related = default_prefetch_related
+        return select_related, prefetch_related
+
+    def get_default_child_related_lookups(self):
+        """
+        Return the `(select_related, prefetch_related)` lookups needed by the
+        serializer.  Without a `serializer_class`, rest_framework builds a new
+        default serializer class on every request, so the lookups found for it
+        are stored on the view class instead of per serializer class.
+        """
+        view_class = self.__class__
+        uses_default_serializer = (
+            self.serializer_class is None and
+            utils._get_unbound_function(view_class, 'get_serializer_class') is
+            utils._get_unbound_function(generics.GenericAPIView, 'get_serializer_class')
+        )
+        if not uses_default_serializer:
+            return utils.find_serializer_related_lookups(self.get_serializer_class())
+
+        try:
+            return view_class.__dict__['_default_serializer_related_lookups']
+        except KeyError:
+            lookups = utils.find_serializer_related_lookups(self.get_serializer_class())
+            view_class._default_serializer_related_lookups = lookups
+            return lookups
+
+    def optimize_child_queryset(self, queryset):
+        """
+        Apply `select_related` and `prefetch_related` to the child queryset so
+        that serializing the children does not run a query per child.
+        """
+        select_related, prefetch_related = self.get_child_related_lookups()
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset
+
+    def paginate_queryset(self, queryset, *args, **kwargs):
+        page = super(NestedResourceMixin, self).paginate_queryset(
+            queryset, *args, **kwargs
+        )
+        if page is not None:
+            self.verify_parent_for_empty_result(page.object_list)
+        return page
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        # A parent check still running in the background must be finished
+        # before the response goes out, and replaces it if the parent is
+        # missing.
+        if self._parent_check is not None:
+            try:
+                self.wait_for_parent_check()
+            except Http404 as exc:
+                response = self.handle_exception(exc)
+        return super(NestedResourceMixin, self).finalize_response(
+            request, response, *args, **kwargs
+        )
+
+    def get_child_queryset(self):
+        """
+        Return a queryset of `self.model` objects that are related to the
+        parent designated by the url, built by filtering on the child side of
+        the relationship rather than through the parent's related manager.
+        Note that `parent_to_child_manager_attr` is not used here.
+        """
+        filter_kwargs = self.get_parent_relationship().get_child_filter_kwargs(
+            self.get_parent_lookup_kwargs(),
+        )
+        return self.model._default_manager.filter(**filter_kwargs)
 
     #
     # getter functions
     #
+    def get_parent_relationship(self):
+        """
+        Return the `ParentRelationship` between `self.model` and
+        `self.parent_model`.  It is stored on the view class so that the
+        relationship discovery is shared by every request to this view.
+        """
+        view_class = self.__class__
+        try:
+            return view_class.__dict__['_parent_relationship']
+        except KeyError:
+            relationship = relationships.get(
+                parent_model=self.parent_model,
+                child_model=self.model,
+            )
+            view_class._parent_relationship = relationship
+            return relationship
+
+    def get_ancestor_lookups(self):
+        """
+        Return a list of `(url_kwarg, lookup)` pairs for `self.ancestor_models`
+        where `lookup` reaches the ancestor's primary key from
+        `self.parent_model`.  It is computed once per view class.
+        """
+        view_class = self.__class__
+        try:
+            return view_class.__dict__['_ancestor_lookups']
+        except KeyError:
+            pass
+
+        if self.ancestor_url_kwargs is not None and len(self.ancestor_url_kwargs) != len(self.ancestor_models):
+            raise ImproperlyConfigured(
+                "`ancestor_url_kwargs` must have one url kwarg for each of the "
+                "`ancestor_models`."
+            )
+
+        ancestor_lookups = []
+        path = []
+        descendant = self.parent_model
+        for index, ancestor in enumerate(self.ancestor_models):
+            relationship = relationships.get(
+                parent_model=ancestor,
+                child_model=descendant,
+            )
+            if relationship.query_name is None:
+                raise ImproperlyConfigured(
+                    "The relationship from {!r} to {!r} cannot be traversed in "
+                    "a query, so {!r} cannot be used in `ancestor_models`.".format(
+                        descendant, ancestor, ancestor,
+                    )
+                )
+            path.append(relationship.query_name)
+
+            if self.ancestor_url_kwargs is not None:
+                url_kwarg = self.ancestor_url_kwargs[index]
+            else:
+                url_kwarg = relationship.url_kwarg
+            ancestor_lookups.append((url_kwarg, '__'.join(path + ['pk'])))
+            descendant = ancestor
+
+        view_class._ancestor_lookups = ancestor_lookups
+        return ancestor_lookups
+
     def get_child_to_parent_accessor_name(self):
         """
         Find the field on the child model that represents the relationship to
         the parent model.
         """
-        return utils.find_child_to_parent_accessor_name(
-            parent_model=self.parent_model,
-            child_model=self.model,
-        )
+        return self.get_parent_relationship().accessor_name
 
     def get_parent_serializer_field_name(self):
         """
@@ -109,24 +618,19 @@ class NestedResourceMixin(object):
         parent, return the name of the serializer field which represents the
         child to parent relationship.
         """
-        return utils.find_child_to_parent_serializer_field(
-            serializer_class=self.get_serializer_class(),
-            parent_accessor_name=self.get_child_to_parent_accessor_name(),
+        return self.get_parent_relationship().get_serializer_field(
+            self.get_serializer_class(),
         )
 
     def get_parent_url_kwarg(self):
-        return utils.compute_default_url_kwarg_for_parent(
-            parent_model=self.parent_model,
-            child_model=self.model,
-        )
+        return self.get_parent_relationship().url_kwarg
 
     def get_parent_to_child_manager(self, parent_obj):
         if self.parent_to_child_manager_attr is not None:
             return getattr(parent_obj, self.parent_to_child_manager_attr)
         else:
-            return utils.find_parent_to_child_manager(
-                parent_obj=parent_obj,
-                child_model=self.model,
+            return getattr(
+                parent_obj, self.get_parent_relationship().manager_attr,
             )
 
     #
@@ -145,10 +649,7 @@ class NestedResourceMixin(object):
         based on the value pulled out of the url kwargs.
         """
         if not self._parent_lookup_field:
-            # making sure we can find an attribute on the child model that
-            # references the parent model.
-            self.get_child_to_parent_accessor_name()
-            self.parent_lookup_field = 'pk'
+            self.parent_lookup_field = self.get_parent_relationship().lookup_field
 
         if not self._parent_lookup_field:
             assert False, "This should not be possible"
@@ -180,3 +681,559 @@ class NestedResourceMixin(object):
     def parent_serializer_field(self, value):
         self._parent_serializer_field = value
 
+
+class BulkCreateNestedResourceMixin(object):
+    """
+    Allows a list of children to be posted to a nested endpoint.  The parent
+    is looked up once, every child is tied to it, and the children are saved
+    with `bulk_create` in batches of `bulk_create_batch_size`.  When the
+    database does not return the primary keys of the new children, they are
+    read back afterwards, so that the response and `post_save` get them,
+    unless children were added to the parent by another writer meanwhile.
+
+    Must be used together with `NestedResourceMixin` on a view which supports
+    `create`.  As with `bulk_create`, the children's `save` method and the
+    model save signals are not called, so this is only suitable for
+    `ForeignKey` and `GenericForeignKey` relationships.  A list posted to a
+    many-to-many endpoint gets a 400 response.
+    """
+    bulk_create_batch_size = None
+
+    default_bulk_create_error_messages = {
+        "many_to_many": "Bulk creation is not supported for many-to-many relationships.",
+    }
+
+    def create(self, request, *args, **kwargs):
+        if isinstance(request.DATA, (list, tuple)):
+            return self.create_many(request, *args, **kwargs)
+        return super(BulkCreateNestedResourceMixin, self).create(
+            request, *args, **kwargs
+        )
+
+    def create_many(self, request, *args, **kwargs):
+        if self.get_parent_relationship().is_many_to_many:
+            raise exceptions.ParseError(
+                self.default_bulk_create_error_messages['many_to_many']
+            )
+
+        parent_obj = self.get_parent_object()
+        serializer = self.get_serializer(
+            data=request.DATA, files=request.FILES, many=True,
+        )
+
+        # Every child has already been checked against the parent, so the
+        # serializer does not need to look the parent up again for each one.
+        parent_field = serializer.fields.get(self.parent_serializer_field)
+        if parent_field is not None:
+            read_only = parent_field.read_only
+            parent_field.read_only = True
+        try:
+            is_valid = serializer.is_valid()
+        finally:
+            if parent_field is not None:
+                parent_field.read_only = read_only
+
+        if not is_valid:
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        accessor_name = self.get_child_to_parent_accessor_name()
+        for obj in serializer.object:
+            setattr(obj, accessor_name, parent_obj)
+            self.pre_save(obj)
+
+        self.bulk_create_children(serializer.object)
+        for obj in serializer.object:
+            self.post_save(obj, created=True)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def bulk_create_children(self, objs):
+        """
+        Save `objs` with `bulk_create`, and set the primary keys it did not.
+        The new children are the children of the parent with a primary key
+        above the largest one before they were saved, in the order they were
+        inserted in.  The parent row is locked meanwhile, so bulk creations
+        under the same parent do not interleave.  If other children of the
+        parent show up among them anyway, the primary keys are left unset.
+        """
+        missing_pks = any(obj.pk is None for obj in objs)
+        with transaction.atomic(savepoint=False):
+            if missing_pks:
+                list(self.parent_model._default_manager.select_for_update().filter(
+                    pk=self.get_parent_object().pk,
+                ).values_list('pk', flat=True))
+                last_pk = self.get_child_queryset().aggregate(
+                    last_pk=Max('pk'),
+                )['last_pk']
+            self.model._default_manager.bulk_create(
+                objs, batch_size=self.bulk_create_batch_size,
+            )
+            if missing_pks and any(obj.pk is None for obj in objs):
+                queryset = self.get_child_queryset()
+                if last_pk is not None:
+                    queryset = queryset.filter(pk__gt=last_pk)
+                pks = list(
+                    queryset.order_by('pk').values_list('pk', flat=True)[:len(objs) + 1]
+                )
+                if len(pks) == len(objs):
+                    for obj, pk in zip(objs, pks):
+                        obj.pk = pk
+        self.handle_bulk_write()
+
+
+class BulkUpdateDestroyNestedResourceMixin(object):
+    """
+    Allows `PATCH` and `DELETE` requests to the list endpoint of a nested
+    resource to update or delete many children with a single query.  The
+    children are chosen with a comma separated list of primary keys in the
+    `bulk_lookup_query_param` query parameter, and are always limited to the
+    children of the parent designated by the url.  Object permissions are
+    checked for each of them, and `auto_now` fields are updated.  Bulk deletion is not
+    allowed for many-to-many relationships, and gets a 405 response.
+
+    Must be used together with `NestedResourceMixin`, and routed with
+    `drf_nested_resource.routers.NestedResourceRouter`.
+    """
+    bulk_lookup_query_param = 'id__in'
+
+    default_bulk_error_messages = {
+        "missing_lookup": "The `{param}` query parameter is required for bulk operations.",
+        "invalid_lookup": "Invalid value in `{param}`: {error}",
+        "invalid_field": "The field `{field}` cannot be updated in bulk.",
+        "no_fields": "No fields to update were provided.",
+    }
+
+    def get_bulk_queryset(self):
+        """
+        Return the children of the parent that were selected by the
+        `bulk_lookup_query_param` query parameter.
+        """
+        param = self.bulk_lookup_query_param
+        value = self.request.QUERY_PARAMS.get(param)
+        if not value:
+            raise exceptions.ParseError(
+                self.default_bulk_error_messages['missing_lookup'].format(
+                    param=param,
+                )
+            )
+
+        pk_field = self.model._meta.pk
+        try:
+            pks = [pk_field.to_python(pk) for pk in value.split(',') if pk]
+        except ValidationError as err:
+            raise exceptions.ParseError(
+                self.default_bulk_error_messages['invalid_lookup'].format(
+                    param=param, error=' '.join(err.messages),
+                )
+            )
+
+        queryset = self.filter_queryset(self.get_queryset())
+        # The related objects are not needed to update or delete.
+        return queryset.filter(pk__in=pks).prefetch_related(None)
+
+    def get_bulk_update_kwargs(self, serializer):
+        """
+        Return the values to update the children with, taken from the
+        validated `serializer` for the fields that were sent.
+        """
+        update_kwargs = {}
+        for field_name in self.request.DATA:
+            if field_name == self.parent_serializer_field:
+                # Already checked to match the parent, so nothing to change.
+                continue
+            field = serializer.fields.get(field_name)
+            if field is None or field.read_only:
+                continue
+
+            source = field.source or field_name
+            try:
+                model_field, _, direct, m2m = self.model._meta.get_field_by_name(source)
+            except FieldDoesNotExist:
+                model_field, direct, m2m = None, False, False
+            if not direct or m2m:
+                raise exceptions.ParseError(
+                    self.default_bulk_error_messages['invalid_field'].format(
+                        field=field_name,
+                    )
+                )
+            update_kwargs[model_field.name] = getattr(
+                serializer.object, model_field.name,
+            )
+
+        if not update_kwargs:
+            raise exceptions.ParseError(
+                self.default_bulk_error_messages['no_fields']
+            )
+
+        # `QuerySet.update` does not call `pre_save`, which is what keeps
+        # `auto_now` fields up to date on a regular save.
+        for model_field in self.model._meta.fields:
+            if getattr(model_field, 'auto_now', False):
+                update_kwargs[model_field.name] = model_field.pre_save(
+                    serializer.object, add=False,
+                )
+        return update_kwargs
+
+    def check_bulk_object_permissions(self, queryset):
+        """
+        Check the object permissions for every child in `queryset`, as a
+        detail request would for each one.  The children are only loaded
+        when one of the permission classes checks objects.
+        """
+        base_check = six.get_unbound_function(
+            permissions.BasePermission.has_object_permission,
+        )
+        checks_objects = any(
+            six.get_unbound_function(
+                type(permission).has_object_permission,
+            ) is not base_check
+            for permission in self.get_permissions()
+        )
+        if checks_objects:
+            for obj in queryset:
+                self.check_object_permissions(self.request, obj)
+
+    def partial_bulk_update(self, request, *args, **kwargs):
+        queryset = self.get_bulk_queryset()
+
+        # The changes are validated against one of the children, in the same
+        # way as a partial update of that child would be.
+        instance = queryset.first()
+        if instance is None:
+            return Response({'count': 0})
+
+        self.check_bulk_object_permissions(queryset)
+
+        serializer = self.get_serializer(
+            instance, data=request.DATA, files=request.FILES, partial=True,
+        )
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        count = queryset.update(**self.get_bulk_update_kwargs(serializer))
+        self.handle_bulk_write()
+        return Response({'count': count})
+
+    def bulk_destroy(self, request, *args, **kwargs):
+        # Deleting the children of a many-to-many relationship would delete
+        # children that are shared with other parents.
+        if self.get_parent_relationship().is_many_to_many:
+            raise exceptions.MethodNotAllowed(request.method)
+        queryset = self.get_bulk_queryset()
+        self.check_bulk_object_permissions(queryset)
+        queryset.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ManyToManyNestedResourceMixin(object):
+    """
+    Makes a nested endpoint over a many-to-many relationship writable.
+    Creating a child links it to the parent, and the `attach` and `detach`
+    actions link and unlink existing children, given as a list of primary
+    keys, in batches of `m2m_batch_size` through the parent's related manager.
+
+    Must be used together with `NestedResourceMixin`, and routed with
+    `drf_nested_resource.routers.NestedResourceRouter` for `attach` and
+    `detach`.
+    """
+    m2m_batch_size = 500
+
+    default_m2m_error_messages = {
+        "invalid_pks": "Expected a list of primary keys.",
+        "missing_pks": "No {model} exists with the primary keys {pks}.",
+    }
+
+    def add_parent_reference(self, data, parent_obj):
+        # The link to the parent is made through the related manager once the
+        # child has been saved, rather than through the serializer.
+        return data
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super(ManyToManyNestedResourceMixin, self).get_serializer(
+            *args, **kwargs
+        )
+        # Links to parents are only changed through the nested endpoints.
+        parent_field = serializer.fields.get(self.get_child_to_parent_accessor_name())
+        if parent_field is not None:
+            parent_field.read_only = True
+        return serializer
+
+    def post_save(self, obj, created=False):
+        super(ManyToManyNestedResourceMixin, self).post_save(obj, created=created)
+        if created:
+            manager = self.get_parent_to_child_manager(self.get_parent_object())
+            manager.add(obj)
+
+    def get_child_pks(self):
+        """
+        Return the primary keys of the children sent in the request, either as
+        a list or as repeated `pk` form values.
+        """
+        if hasattr(self.request.DATA, 'getlist'):
+            values = self.request.DATA.getlist('pk')
+        elif isinstance(self.request.DATA, (list, tuple)):
+            values = self.request.DATA
+        else:
+            raise exceptions.ParseError(
+                self.default_m2m_error_messages['invalid_pks']
+            )
+
+        pk_field = self.model._meta.pk
+        try:
+            return [pk_field.to_python(value) for value in values]
+        except ValidationError:
+            raise exceptions.ParseError(
+                self.default_m2m_error_messages['invalid_pks']
+            )
+
+    def get_child_pk_batches(self, pks):
+        pks = list(pks)
+        for index in range(0, len(pks), self.m2m_batch_size):
+            yield pks[index:index + self.m2m_batch_size]
+
+    def attach(self, request, *args, **kwargs):
+        manager = self.get_parent_to_child_manager(self.get_parent_object())
+        pks = self.get_child_pks()
+
+        missing_pks = []
+        for batch in self.get_child_pk_batches(pks):
+            existing_pks = set(
+                self.model._default_manager.filter(
+                    pk__in=batch,
+                ).values_list('pk', flat=True)
+            )
+            missing_pks.extend(pk for pk in batch if pk not in existing_pks)
+        if missing_pks:
+            raise exceptions.ParseError(
+                self.default_m2m_error_messages['missing_pks'].format(
+                    model=self.model._meta.object_name, pks=missing_pks,
+                )
+            )
+
+        with transaction.atomic():
+            for batch in self.get_child_pk_batches(pks):
+                manager.add(*batch)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def detach(self, request, *args, **kwargs):
+        manager = self.get_parent_to_child_manager(self.get_parent_object())
+        with transaction.atomic():
+            for batch in self.get_child_pk_batches(self.get_child_pks()):
+                manager.remove(*batch)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class StreamingListNestedResourceMixin(object):
+    """
+    Streams the list of children as a JSON array, serializing
+    `stream_chunk_size` children at a time, so memory use stays flat however
+    many children the parent has.
+
+    The children are read in chunks ordered by primary key, each chunk
+    starting after the last primary key of the previous one, rather than with
+    `QuerySet.iterator()`.  Every chunk is a bounded query, and
+    `prefetch_related` still applies to it.  The first chunk is read before
+    the response is started, so a missing parent still results in a 404.
+
+    The response is always JSON, and is not paginated.
+    """
+    stream_chunk_size = 500
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset()).order_by('pk')
+        chunks = self.get_child_chunks(queryset)
+
+        first_chunk = next(chunks)
+        if not self.allow_empty and not first_chunk:
+            raise Http404(
+                "Empty list and '%s.allow_empty' is False." % self.__class__.__name__
+            )
+        first_data = self.get_serializer(first_chunk, many=True).data
+
+        return StreamingHttpResponse(
+            self.stream_json(first_data, chunks),
+            content_type='application/json',
+        )
+
+    def get_child_chunks(self, queryset):
+        """
+        Yield lists of at most `stream_chunk_size` children.  The first list
+        is always yielded, even when it is empty.
+        """
+        chunk = list(queryset[:self.stream_chunk_size])
+        yield chunk
+        while len(chunk) == self.stream_chunk_size:
+            chunk = list(
+                queryset.filter(pk__gt=chunk[-1].pk)[:self.stream_chunk_size]
+            )
+            if not chunk:
+                break
+            yield chunk
+
+    def stream_json(self, first_data, chunks):
+        yield '['
+        separator = ''
+        for data in itertools.chain(
+            [first_data],
+            (self.get_serializer(chunk, many=True).data for chunk in chunks),
+        ):
+            if not data:
+                continue
+            yield separator + ','.join(
+                json.dumps(item, cls=encoders.JSONEncoder) for item in data
+            )
+            separator = ','
+        yield ']'
+
+
+class AggregateNestedResourceMixin(object):
+    """
+    Adds a `count` action which returns the number of children of the parent,
+    along with the `child_aggregates`, computed in a single aggregate query
+    without loading the children, e.g. `{'count': 12, 'total': 340}` for
+    `child_aggregates = {'total': Sum('amount')}`.
+
+    Set `child_aggregate_cache` to an instance of
+    `drf_nested_resource.cache.ChildAggregateCache` to reuse the results until
+    the children change.
+
+    Must be used together with `NestedResourceMixin`, and routed with
+    `drf_nested_resource.routers.NestedResourceRouter`.
+    """
+    child_aggregates = None
+    child_aggregate_cache = None
+
+    def count(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        data = None
+        if self.child_aggregate_cache is not None:
+            cache_key = self.child_aggregate_cache.make_key(
+                self.model, self.get_child_aggregate_cache_kwargs(),
+            )
+            data = self.child_aggregate_cache.get_by_key(cache_key)
+        if data is None:
+            data = self.get_child_aggregates(queryset)
+            if self.child_aggregate_cache is not None:
+                self.child_aggregate_cache.set_by_key(cache_key, data)
+
+        if not data['count']:
+            self.verify_parent_for_empty_result([])
+        return Response(data)
+
+    def handle_bulk_write(self):
+        super(AggregateNestedResourceMixin, self).handle_bulk_write()
+        if self.child_aggregate_cache is not None:
+            self.child_aggregate_cache.invalidate(self.model)
+
+    def get_child_aggregates(self, queryset):
+        aggregates = {'count': Count('pk')}
+        aggregates.update(self.child_aggregates or {})
+        return queryset.aggregate(**aggregates)
+
+    def get_child_aggregate_cache_kwargs(self):
+        """
+        Return what the cached aggregates are keyed by: the view, the parent
+        and the query parameters, which may filter the children.
+        """
+        return {
+            'view': '{0}.{1}'.format(
+                self.__class__.__module__, self.__class__.__name__,
+            ),
+            'parent': sorted(
+                (key, str(value))
+                for key, value in self.get_parent_lookup_kwargs().items()
+            ),
+            'query': sorted(self.request.QUERY_PARAMS.lists()),
+        }
+
+
+class ConditionalNestedResourceMixin(object):
+    """
+    Adds `ETag` and `Last-Modified` headers to the list and detail responses,
+    and answers conditional requests whose validators still match with a 304,
+    without loading or serializing the children.
+
+    The validators are computed with a single aggregate query over the nested
+    queryset: the latest value of `last_modified_field` and the number of
+    children, so that deleted children are noticed too.
+
+    Must be used together with `NestedResourceMixin`.
+    """
+    last_modified_field = None
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.get_conditional_response(
+            queryset, super(ConditionalNestedResourceMixin, self).list, True,
+            request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = getattr(self, 'lookup_url_kwarg', None) or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        return self.get_conditional_response(
+            queryset, super(ConditionalNestedResourceMixin, self).retrieve, False,
+            request, *args, **kwargs
+        )
+
+    def get_conditional_response(self, queryset, view_func, many, request, *args, **kwargs):
+        """
+        Return a 304 if the validators of `queryset` match the request,
+        otherwise the response of `view_func` with the validators set.
+        """
+        count, last_modified = self.get_conditional_aggregates(queryset)
+        if not count:
+            if not many:
+                # Let the view respond with its 404.
+                return view_func(request, *args, **kwargs)
+            self.verify_parent_for_empty_result([])
+        etag = self.compute_etag(count, last_modified)
+
+        if self.is_not_modified(request, etag, last_modified):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = view_func(request, *args, **kwargs)
+
+        if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def get_conditional_aggregates(self, queryset):
+        """
+        Return the number of children in `queryset`, and the latest value of
+        their `last_modified_field` as a timestamp.
+        """
+        if self.last_modified_field is None:
+            raise ImproperlyConfigured(
+                "`{0}` must set `last_modified_field`".format(self.__class__.__name__)
+            )
+        aggregates = queryset.aggregate(
+            count=Count('pk'), last_modified=Max(self.last_modified_field),
+        )
+        last_modified = aggregates['last_modified']
+        if last_modified is not None:
+            last_modified = timegm(last_modified.utctimetuple())
+        return aggregates['count'], last_modified
+
+    def compute_etag(self, count, last_modified):
+        value = '{0}:{1}:{2}'.format(
+            sorted(self.get_parent_lookup_kwargs().items()), count, last_modified,
+        )
+        # Weak, as the same children may be rendered in several formats.
+        return 'W/' + quote_etag(hashlib.md5(value.encode('utf-8')).hexdigest())
+
+    def is_not_modified(self, request, etag, last_modified):
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match:
+            etags = parse_etags(if_none_match)
+            return '*' in etags or parse_etags(etag)[0] in etags
+
+        if_modified_since = request.META.get('HTTP_IF_MODIFIED_SINCE')
+        if if_modified_since and last_modified is not None:
+            if_modified_since = parse_http_date_safe(if_modified_since)
+            return if_modified_since is not None and last_modified <= if_modified_since
+        return False
@@ -0,0 +1,136 @@
+from django.core import signing
+from django.core.exceptions import ValidationError
+
+from rest_framework import exceptions
+from rest_framework import serializers
+from rest_framework.pagination import BasePaginationSerializer
+from rest_framework.templatetags.rest_framework import replace_query_param
+
+
+class KeysetPage(object):
+    """
+    A single page of children, along with the cursor for the following page.
+    """
+    def __init__(self, object_list, next_cursor, cursor_query_param):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.cursor_query_param = cursor_query_param
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+class NextCursorField(serializers.Field):
+    """
+    Field that returns a link to the next page of a `KeysetPage`.
+    """
+    def to_native(self, value):
+        if not value.has_next():
+            return None
+        request = self.context.get('request')
+        url = request and request.build_absolute_uri() or ''
+        return replace_query_param(url, value.cursor_query_param, value.next_cursor)
+
+
+class KeysetPaginationSerializer(BasePaginationSerializer):
+    """
+    A pagination serializer for `KeysetPage`.  There is no `count`, as
+    counting the children of a large parent costs as much as the deep pages
+    keyset pagination avoids.
+    """
+    next = NextCursorField(source='*')
+
+
+class KeysetPaginationMixin(object):
+    """
+    Paginates the children of a parent by primary key rather than by offset.
+    Each page is fetched with `pk > <last pk of the previous page>`, so deep
+    pages cost the same as the first one.  The children are already filtered
+    on a single parent, so ordering by primary key lets the database walk an
+    index on `(parent fk, pk)` for foreign key and generic relationships, or
+    on the through table for many-to-many relationships.
+
+    The cursor is opaque and signed, and encodes the parent it was issued
+    for, so it cannot be forged or replayed against another parent.
+
+    Must be used together with `NestedResourceMixin`, before it.  Any ordering
+    of the queryset is replaced by the primary key ordering.
+    """
+    cursor_query_param = 'cursor'
+    pagination_serializer_class = KeysetPaginationSerializer
+
+    default_cursor_error_messages = {
+        "invalid_cursor": "Invalid cursor.",
+    }
+
+    def paginate_queryset(self, queryset, page_size=None):
+        page_size = page_size or self.get_paginate_by()
+        if not page_size:
+            return None
+
+        queryset = queryset.order_by('pk')
+        position = self.get_cursor_position()
+        if position is not None:
+            queryset = queryset.filter(pk__gt=position)
+
+        # Fetching one extra child tells if there is a next page without
+        # having to count the children.
+        object_list = list(queryset[:page_size + 1])
+        if len(object_list) > page_size:
+            object_list = object_list[:page_size]
+            next_cursor = self.make_cursor(object_list[-1].pk)
+        else:
+            next_cursor = None
+
+        self.verify_parent_for_empty_result(object_list)
+        return KeysetPage(object_list, next_cursor, self.cursor_query_param)
+
+    def get_cursor_scope(self):
+        """
+        Return what a cursor is bound to: the child model and the lookups of
+        the parent it was issued for.
+        """
+        return [
+            str(self.model._meta),
+            sorted(
+                [key, str(value)]
+                for key, value in self.get_parent_lookup_kwargs().items()
+            ),
+        ]
+
+    def get_cursor_salt(self):
+        return 'drf_nested_resource.pagination.{0}'.format(self.__class__.__name__)
+
+    def make_cursor(self, position):
+        return signing.dumps(
+            {'scope': self.get_cursor_scope(), 'position': str(position)},
+            salt=self.get_cursor_salt(),
+        )
+
+    def get_cursor_position(self):
+        """
+        Return the primary key of the last child of the previous page, or
+        `None` for the first page.
+        """
+        cursor = self.request.QUERY_PARAMS.get(self.cursor_query_param)
+        if not cursor:
+            return None
+
+        try:
+            payload = signing.loads(cursor, salt=self.get_cursor_salt())
+        except signing.BadSignature:
+            raise exceptions.ParseError(
+                self.default_cursor_error_messages['invalid_cursor']
+            )
+
+        if payload.get('scope') != self.get_cursor_scope():
+            raise exceptions.ParseError(
+                self.default_cursor_error_messages['invalid_cursor']
+            )
+
+        try:
+            return self.model._meta.pk.to_python(payload['position'])
+        except (KeyError, ValueError, TypeError, ValidationError):
+            raise exceptions.ParseError(
+                self.default_cursor_error_messages['invalid_cursor']
+            )
@@ -0,0 +1,106 @@
+import re
+from importlib import import_module
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from drf_nested_resource.relationships import ParentRelationship
+
+
+class RelationshipRegistry(object):
+    """
+    Table of every `ParentRelationship` in use, keyed by
+    `(parent_model, child_model)` so that views nesting the same models share
+    a single relationship.
+
+    Registering the routers which hold the nested views resolves and validates
+    every relationship up front, so that misconfigured views fail at startup
+    and no request pays for the relationship discovery.
+    """
+    def __init__(self):
+        self._relationships = {}
+
+    def __len__(self):
+        return len(self._relationships)
+
+    def __contains__(self, key):
+        return key in self._relationships
+
+    def get(self, parent_model, child_model):
+        """
+        Return the `ParentRelationship` for the given models, creating it if
+        it does not exist yet.
+        """
+        key = (parent_model, child_model)
+        try:
+            return self._relationships[key]
+        except KeyError:
+            return self._relationships.setdefault(
+                key, ParentRelationship(parent_model, child_model),
+            )
+
+    def register_viewset(self, viewset, prefix=None):
+        """
+        Resolve the relationship used by `viewset`, raising
+        `ImproperlyConfigured` if it cannot be resolved.  When the url
+        `prefix` the view is routed under is given, it is also checked to
+        contain the url kwarg for the parent.
+        """
+        view = viewset()
+        relationship = view.get_parent_relationship()
+        # The parent's manager is only looked up when the view does not name
+        # it itself.
+        relationship.resolve(
+            with_manager_attr=view.parent_to_child_manager_attr is None,
+        )
+        self._relationships.setdefault(
+            (relationship.parent_model, relationship.child_model), relationship,
+        )
+
+        parent_url_kwarg = view.parent_url_kwarg
+
+        ancestor_url_kwargs = [
+            url_kwarg for url_kwarg, lookup in view.get_ancestor_lookups()
+        ]
+
+        if prefix is not None:
+            groupindex = re.compile(prefix).groupindex
+            for url_kwarg in [parent_url_kwarg] + ancestor_url_kwargs:
+                if url_kwarg not in groupindex:
+                    raise ImproperlyConfigured(
+                        "The url prefix {0!r} for {1!r} does not capture the "
+                        "url kwarg {2!r}.  You may need to declare "
+                        "`parent_url_kwarg` or `ancestor_url_kwargs` on your "
+                        "view.".format(
+                            prefix, viewset, url_kwarg,
+                        )
+                    )
+        return relationship
+
+    def register_router(self, router):
+        """
+        Resolve the relationships of every nested view registered on a
+        rest_framework router.
+        """
+        for prefix, viewset, base_name in router.registry:
+            if hasattr(viewset, 'get_parent_relationship'):
+                self.register_viewset(viewset, prefix=prefix)
+
+    def autodiscover(self):
+        """
+        Register each router listed by dotted path in the
+        `DRF_NESTED_RESOURCE_ROUTERS` setting.
+        """
+        for router_path in getattr(settings, 'DRF_NESTED_RESOURCE_ROUTERS', ()):
+            module_path, _, router_name = router_path.rpartition('.')
+            try:
+                router = getattr(import_module(module_path), router_name)
+            except (ImportError, AttributeError):
+                raise ImproperlyConfigured(
+                    "Unable to import router {0!r} listed in "
+                    "`DRF_NESTED_RESOURCE_ROUTERS`.".format(router_path)
+                )
+            self.register_router(router)
+
+
+relationships = RelationshipRegistry()
@@ -0,0 +1,208 @@
+from django.contrib.contenttypes.models import ContentType
+from django.utils.functional import cached_property
+
+from drf_nested_resource import utils
+
+
+class ParentRelationship(object):
+    """
+    Describes how a child model relates to its parent model.
+
+    Each piece of information is discovered through `drf_nested_resource.utils`
+    the first time it is needed and then kept for the lifetime of the
+    relationship, so the model introspection only happens once per view class
+    rather than once per request.
+    """
+    def __init__(self, parent_model, child_model):
+        self.parent_model = parent_model
+        self.child_model = child_model
+
+    def __repr__(self):
+        return '<ParentRelationship: {0} -> {1}>'.format(
+            self.child_model._meta.object_name,
+            self.parent_model._meta.object_name,
+        )
+
+    def resolve(self, with_manager_attr=False):
+        """
+        Discover the parts of the relationship which every view relies on,
+        and the `manager_attr` if `with_manager_attr` is set, raising
+        `ImproperlyConfigured` if the models are not related.
+        """
+        names = ['accessor_name', 'lookup_field', 'query_name']
+        if with_manager_attr:
+            names.append('manager_attr')
+        for name in names:
+            getattr(self, name)
+
+    @cached_property
+    def accessor_name(self):
+        """
+        The name of the attribute on the child model which references the
+        parent model.
+        """
+        return utils.find_child_to_parent_accessor_name(
+            parent_model=self.parent_model,
+            child_model=self.child_model,
+        )
+
+    @cached_property
+    def url_kwarg(self):
+        """
+        The default url kwarg that holds the value used to lookup the parent.
+        """
+        return utils.compute_default_url_kwarg_for_parent(
+            parent_model=self.parent_model,
+            child_model=self.child_model,
+        )
+
+    @cached_property
+    def lookup_field(self):
+        """
+        The field on the parent model which the url kwarg is matched against.
+        """
+        # making sure we can find an attribute on the child model that
+        # references the parent model.
+        self.accessor_name
+        return 'pk'
+
+    @cached_property
+    def manager_attr(self):
+        """
+        The name of the attribute on parent instances which holds the manager
+        for the related child instances.
+        """
+        return utils.find_parent_to_child_manager_attr(
+            parent_model=self.parent_model,
+            child_model=self.child_model,
+        )
+
+    @cached_property
+    def query_name(self):
+        """
+        The name used in queryset lookups on the child model to traverse to
+        the parent model, or `None` for generic relationships.
+        """
+        return utils.find_child_to_parent_query_name(
+            parent_model=self.parent_model,
+            child_model=self.child_model,
+        )
+
+    @cached_property
+    def is_many_to_many(self):
+        """
+        Whether the relationship is backed by a `ManyToManyField`, declared on
+        either model.
+        """
+        if self.query_name is None:
+            return False
+        child_index = utils.get_relation_index(self.child_model)
+        return self.parent_model not in child_index.foreign_keys
+
+    @cached_property
+    def generic_foreign_key(self):
+        """
+        The `GenericForeignKey` on the child model which references the parent
+        model.
+        """
+        return utils.get_virtual_field(self.child_model, self.accessor_name)
+
+    def get_child_filter_kwargs(self, parent_lookup_kwargs):
+        """
+        Given the lookup kwargs for a parent instance, return the kwargs which
+        filter the child model down to the children of that parent without
+        needing the parent instance.
+        """
+        if self.query_name is not None:
+            return dict(
+                ('{0}__{1}'.format(self.query_name, key), value)
+                for key, value in parent_lookup_kwargs.items()
+            )
+
+        field = self.generic_foreign_key
+        filter_kwargs = {
+            field.ct_field: ContentType.objects.get_for_model(self.parent_model),
+        }
+        if list(parent_lookup_kwargs.keys()) == ['pk']:
+            filter_kwargs[field.fk_field] = parent_lookup_kwargs['pk']
+        else:
+            filter_kwargs['{0}__in'.format(field.fk_field)] = (
+                self.parent_model._default_manager.filter(
+                    **parent_lookup_kwargs
+                ).values_list('pk', flat=True)
+            )
+        return filter_kwargs
+
+    def get_child_to_parent_field(self, manager_attr=None):
+        """
+        Return the field on the child model which the parent's manager at
+        `manager_attr`, by default `self.manager_attr`, follows to reach the
+        children: a `ForeignKey`, or a `GenericForeignKey`.  Returns `None`
+        for many-to-many relationships, or when the manager is not one of
+        Django's related managers.
+        """
+        if self.is_many_to_many:
+            return None
+
+        descriptor = getattr(self.parent_model, manager_attr or self.manager_attr, None)
+        if self.query_name is None:
+            generic_relation = getattr(descriptor, 'field', None)
+            if generic_relation is None:
+                return None
+            return utils.get_relation_index(
+                self.child_model,
+            ).find_generic_foreign_key(generic_relation)
+
+        related = getattr(descriptor, 'related', None)
+        if related is None:
+            return None
+        return related.field
+
+    def attach_parent(self, queryset, parent_obj, manager_attr=None):
+        """
+        Return a copy of the child `queryset` which sets `parent_obj` as the
+        already loaded parent of every child it returns, the way Django's
+        related managers do, so accessing the parent from a child does not
+        query it again.  The parent is set on the field followed by the
+        manager at `manager_attr`.  Many-to-many children are returned
+        unchanged.
+        """
+        field = self.get_child_to_parent_field(manager_attr)
+        if field is None:
+            return queryset
+        if self.query_name is None:
+            field = _KnownGenericForeignKey(field)
+
+        queryset = queryset.all()
+        known_related_objects = dict(queryset._known_related_objects)
+        known_related_objects[field] = {parent_obj.pk: parent_obj}
+        queryset._known_related_objects = known_related_objects
+        return queryset
+
+    def get_serializer_field(self, serializer_class):
+        """
+        Return the name of the field on `serializer_class` which represents
+        the child to parent relationship.
+        """
+        return utils.find_child_to_parent_serializer_field(
+            serializer_class=serializer_class,
+            parent_accessor_name=self.accessor_name,
+        )
+
+
+class _KnownGenericForeignKey(object):
+    """
+    Presents a `GenericForeignKey` the way the queryset's known related
+    objects expect a `ForeignKey`: the instance is looked up by the value of
+    the object id field, children which already hold their parent are
+    skipped, and the parent is set through the `GenericForeignKey`.
+    """
+    def __init__(self, field):
+        self.field = field
+        self.name = field.name
+
+    def get_attname(self):
+        return self.field.fk_field
+
+    def get_cache_name(self):
+        return self.field.cache_attr
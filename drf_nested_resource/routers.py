@@ -0,0 +1,40 @@
+from rest_framework.routers import Route, SimpleRouter
+
+
+class NestedResourceRouter(SimpleRouter):
+    """
+    A `SimpleRouter` which also routes the list level actions provided by the
+    mixins in `drf_nested_resource.mixins`: bulk updates and deletes,
+    `attach`, `detach` and `count`.  Actions a view does not implement are not
+    routed.
+    """
+    routes = list(SimpleRouter.routes)
+    routes[0] = routes[0]._replace(
+        mapping=dict(
+            routes[0].mapping,
+            patch='partial_bulk_update',
+            delete='bulk_destroy',
+        ),
+    )
+    # These have to come before the detail route, which would otherwise match
+    # them.
+    routes[1:1] = [
+        Route(
+            url=r'^{prefix}/attach{trailing_slash}$',
+            mapping={'post': 'attach'},
+            name='{basename}-attach',
+            initkwargs={},
+        ),
+        Route(
+            url=r'^{prefix}/detach{trailing_slash}$',
+            mapping={'post': 'detach'},
+            name='{basename}-detach',
+            initkwargs={},
+        ),
+        Route(
+            url=r'^{prefix}/count{trailing_slash}$',
+            mapping={'get': 'count'},
+            name='{basename}-count',
+            initkwargs={},
+        ),
+    ]
@@ -1,7 +1,10 @@
 import re
+import weakref
+import functools
 import itertools
 
 from django.db import models
+from django.db.models.signals import class_prepared
 from django.db.models.fields import FieldDoesNotExist
 from django.db.models.fields.related import (
     ManyRelatedObjectsDescriptor,
@@ -10,55 +13,123 @@ from django.db.models.fields.related import (
 
 from django.core.exceptions import ImproperlyConfigured
 
+from rest_framework import serializers
+
 from drf_nested_resource.compat import singular_noun, GenericForeignKey, GenericRelation, GenericRel
 
 
-def is_generic_relationship_pair(parent_field, child_field):
+class RelationIndex(object):
     """
-    Given a field from the parent model and a field from the child model
+    The relationship fields declared on a model, indexed by what they point
+    to so that finding the relationship between two models does not require
+    scanning every field.
     """
-    if not isinstance(child_field, GenericForeignKey):
-        return False
+    def __init__(self, model):
+        opts = model._meta
+
+        self.foreign_keys = {}
+        for field in opts.fields:
+            if isinstance(field, models.ForeignKey):
+                self.foreign_keys.setdefault(field.rel.to, field)
+
+        self.many_to_many = {}
+        for field in opts.many_to_many:
+            self.many_to_many.setdefault(field.rel.to, field)
+
+        self.generic_relations = []
+        self.generic_foreign_keys = {}
+        for field in opts.virtual_fields:
+            if isinstance(field, GenericRelation):
+                self.generic_relations.append(field)
+            elif isinstance(field, GenericForeignKey):
+                self.generic_foreign_keys.setdefault(
+                    (field.ct_field, field.fk_field), field,
+                )
 
-    if not isinstance(parent_field, GenericRelation):
-        return False
+    def find_generic_foreign_key(self, generic_relation):
+        """
+        Return the `GenericForeignKey` on this model which pairs with the
+        given `GenericRelation`, or `None`.
+        """
+        return self.generic_foreign_keys.get((
+            generic_relation.content_type_field_name,
+            generic_relation.object_id_field_name,
+        ))
 
-    child_model = child_field.model
 
-    ct_field = child_model._meta.get_field(child_field.ct_field)
-    fk_field = child_model._meta.get_field(child_field.fk_field)
+_relation_indexes = {}
+_relation_lookups = {}
 
-    expected_ct_field = child_model._meta.get_field(
-        parent_field.content_type_field_name,
-    )
-    expected_fk_field = child_model._meta.get_field(
-        parent_field.object_id_field_name,
-    )
 
-    return (
-        ct_field == expected_ct_field and fk_field == expected_fk_field
-    )
+def get_relation_index(model):
+    try:
+        return _relation_indexes[model]
+    except KeyError:
+        return _relation_indexes.setdefault(model, RelationIndex(model))
+
+
+def clear_relation_caches():
+    """
+    Discard the relation indexes and the results of the relationship lookups
+    between models.
+    """
+    _relation_indexes.clear()
+    _relation_lookups.clear()
+
+
+def _clear_relation_caches_on_class_prepared(sender, **kwargs):
+    # A newly registered model may resolve relations that were still pending
+    # when the indexes were built.
+    clear_relation_caches()
+
+
+class_prepared.connect(
+    _clear_relation_caches_on_class_prepared,
+    dispatch_uid='drf_nested_resource.utils.clear_relation_caches',
+)
+
+
+def cache_relation_lookup(func):
+    """
+    Remember the result of a relationship lookup between a `parent_model` and
+    a `child_model`.
+    """
+    @functools.wraps(func)
+    def wrapper(parent_model, child_model):
+        key = (func.__name__, parent_model, child_model)
+        try:
+            return _relation_lookups[key]
+        except KeyError:
+            return _relation_lookups.setdefault(
+                key, func(parent_model=parent_model, child_model=child_model),
+            )
+    return wrapper
 
 
+@cache_relation_lookup
 def find_child_to_parent_accessor_name(parent_model, child_model):
+    child_index = get_relation_index(child_model)
+    parent_index = get_relation_index(parent_model)
+
     # ForeignKey relationship
-    for field in child_model._meta.fields:
-        if isinstance(field, models.ForeignKey) and field.rel.to is parent_model:
-            return field.name
+    field = child_index.foreign_keys.get(parent_model)
+    if field is not None:
+        return field.name
 
     # ManyToMany relationship where the field is declared on the `child_model`
-    for field in child_model._meta.many_to_many:
-        if field.rel.to is parent_model:
-            return field.attname
+    field = child_index.many_to_many.get(parent_model)
+    if field is not None:
+        return field.attname
 
     # ManyToMany relationship where the field is declared on the `parent_model`
-    for field in parent_model._meta.many_to_many:
-        if field.rel.to is child_model:
-            return field.rel.related_name
+    field = parent_index.many_to_many.get(child_model)
+    if field is not None:
+        return field.rel.related_name
 
     # GenericForeignKey relationship
-    for parent_field, child_field in itertools.product(parent_model._meta.virtual_fields, child_model._meta.virtual_fields):
-        if is_generic_relationship_pair(parent_field, child_field):
+    for parent_field in parent_index.generic_relations:
+        child_field = child_index.find_generic_foreign_key(parent_field)
+        if child_field is not None:
             return child_field.name
 
     raise ImproperlyConfigured(
@@ -67,31 +138,129 @@ def find_child_to_parent_accessor_name(parent_model, child_model):
     )
 
 
+@cache_relation_lookup
+def find_child_to_parent_query_name(parent_model, child_model):
+    """
+    Return the name that is used in queryset lookups on `child_model` to
+    traverse the relationship to `parent_model`.  Returns `None` for
+    `GenericForeignKey` relationships which cannot be traversed in lookups.
+    """
+    child_index = get_relation_index(child_model)
+    parent_index = get_relation_index(parent_model)
+
+    # ForeignKey relationship
+    field = child_index.foreign_keys.get(parent_model)
+    if field is not None:
+        return field.name
+
+    # ManyToMany relationship where the field is declared on the `child_model`
+    field = child_index.many_to_many.get(parent_model)
+    if field is not None:
+        if parent_model is child_model and not field.rel.symmetrical:
+            # The parent's manager follows the field forwards, so its children
+            # are the objects which reach the parent in reverse.
+            return field.related_query_name()
+        return field.name
+
+    # ManyToMany relationship where the field is declared on the `parent_model`
+    field = parent_index.many_to_many.get(child_model)
+    if field is not None:
+        return field.related_query_name()
+
+    return None
+
+
+# Per serializer class caches.  Weak references are used because the
+# default serializer classes of rest_framework views are created on the fly.
+_serializer_field_names = weakref.WeakKeyDictionary()
+_child_to_parent_serializer_fields = weakref.WeakKeyDictionary()
+_serializer_related_lookups = weakref.WeakKeyDictionary()
+
+
+def _get_unbound_function(cls, name):
+    method = getattr(cls, name)
+    return getattr(method, '__func__', method)
+
+
+def _has_default_field_discovery(serializer_class):
+    """
+    Whether `serializer_class` builds its fields the way the rest_framework
+    serializers do, meaning its fields can be known without instantiating it.
+    """
+    if _get_unbound_function(serializer_class, 'get_fields') is not _get_unbound_function(serializers.BaseSerializer, 'get_fields'):
+        return False
+    return _get_unbound_function(serializer_class, 'get_default_fields') in (
+        _get_unbound_function(serializers.BaseSerializer, 'get_default_fields'),
+        _get_unbound_function(serializers.ModelSerializer, 'get_default_fields'),
+        _get_unbound_function(serializers.HyperlinkedModelSerializer, 'get_default_fields'),
+    )
+
+
+def get_serializer_field_names(serializer_class):
+    """
+    Return the names of the fields that `serializer_class` will have, computed
+    from the declared fields and the `Meta` options when possible so that the
+    serializer and its field objects do not have to be constructed.
+    """
+    try:
+        return _serializer_field_names[serializer_class]
+    except KeyError:
+        pass
+
+    meta = getattr(serializer_class, 'Meta', None)
+
+    if not _has_default_field_discovery(serializer_class):
+        field_names = frozenset(serializer_class().get_fields())
+    elif getattr(meta, 'fields', None):
+        field_names = frozenset(meta.fields) - frozenset(getattr(meta, 'exclude', None) or ())
+    else:
+        field_names = set(serializer_class.base_fields)
+        model = getattr(meta, 'model', None)
+        if issubclass(serializer_class, serializers.ModelSerializer) and model is not None:
+            opts = model._meta
+            field_names.add(opts.pk.name)
+            field_names.update(
+                field.name for field in opts.fields + opts.many_to_many
+                if field.serialize
+            )
+            if issubclass(serializer_class, serializers.HyperlinkedModelSerializer):
+                field_names.add('url')
+        field_names = frozenset(field_names) - frozenset(getattr(meta, 'exclude', None) or ())
+
+    _serializer_field_names[serializer_class] = field_names
+    return field_names
+
+
 def find_child_to_parent_serializer_field(serializer_class, parent_accessor_name):
     """
     Given a serializer class (for the child model) and the name of the
     attribute on the child model which references the parent model, find the
     name of the serializer field that *likely* references the parent model.
     """
-    serializer = serializer_class()
+    cache = _child_to_parent_serializer_fields.setdefault(serializer_class, {})
+    try:
+        return cache[parent_accessor_name]
+    except KeyError:
+        pass
 
-    def is_serializer_field(name):
-        return name in serializer.get_fields()
+    field_names = get_serializer_field_names(serializer_class)
 
     # keep track of the values that were checked for nice error message reporting.
     checked = [parent_accessor_name]
 
     # there may be a serializer field by the exact name of the child to
     # parent accessor attribute.
-    if is_serializer_field(parent_accessor_name):
+    if parent_accessor_name in field_names:
+        cache[parent_accessor_name] = parent_accessor_name
         return parent_accessor_name
 
     # it may be something like a ForeignKey whech has the `_id` suffix.
-    child_model = serializer.Meta.model
+    child_model = serializer_class.Meta.model
     try:
         field = child_model._meta.get_field(parent_accessor_name)
         checked.append(field.attname)
-        if is_serializer_field(field.attname):
+        if field.attname in field_names:
+            cache[parent_accessor_name] = field.attname
             return field.attname
     except FieldDoesNotExist:
         pass
@@ -105,6 +274,92 @@ def find_child_to_parent_serializer_field(serializer_class, parent_accessor_name
     )
 
 
+def _get_related_lookup_type(model, source):
+    """
+    Return `'select'` if the attribute `source` on `model` is a forward
+    `ForeignKey` or `OneToOneField`, `'prefetch'` if it is a many-to-many or
+    reverse relationship, and `None` otherwise.
+    """
+    try:
+        field, _, direct, m2m = model._meta.get_field_by_name(source)
+    except FieldDoesNotExist:
+        return None
+    if m2m or not direct:
+        return 'prefetch'
+    if getattr(field, 'rel', None) is not None:
+        return 'select'
+    return None
+
+
+def _serializer_field_loads_related_object(field):
+    """
+    Whether the serializer `field` needs the related object(s), rather than
+    just the value of the foreign key column, to be represented.
+    """
+    if isinstance(field, serializers.BaseSerializer):
+        return True
+    if isinstance(field, serializers.RelatedField):
+        if getattr(field, 'many', False):
+            return True
+        return not isinstance(field, serializers.PrimaryKeyRelatedField)
+    return False
+
+
+def find_serializer_related_lookups(serializer_class):
+    """
+    Return a `(select_related, prefetch_related)` pair of the lookups which
+    avoid a query per object when serializing instances of the model of
+    `serializer_class`.  The result is cached per serializer class.
+    """
+    try:
+        return _serializer_related_lookups[serializer_class]
+    except KeyError:
+        pass
+
+    meta = getattr(serializer_class, 'Meta', None)
+    model = getattr(meta, 'model', None)
+    select_related, prefetch_related = [], []
+
+    if model is not None:
+        if _has_default_field_discovery(serializer_class):
+            # The fields which are not declared are the default fields of a
+            # `ModelSerializer`; only related objects of nested (`depth`) or
+            # hyperlinked fields, and all many-to-many values, are needed.
+            declared_fields = serializer_class.base_fields
+            loads_related_objects = bool(getattr(meta, 'depth', 0)) or issubclass(
+                serializer_class, serializers.HyperlinkedModelSerializer,
+            )
+            fields = []
+            for name in get_serializer_field_names(serializer_class):
+                if name in declared_fields:
+                    field = declared_fields[name]
+                    if _serializer_field_loads_related_object(field):
+                        fields.append(field.source or name)
+                else:
+                    lookup_type = _get_related_lookup_type(model, name)
+                    if lookup_type == 'prefetch' or loads_related_objects:
+                        fields.append(name)
+        else:
+            fields = [
+                field.source or name
+                for name, field in serializer_class().get_fields().items()
+                if _serializer_field_loads_related_object(field)
+            ]
+
+        for source in fields:
+            # Only the first step of a dotted source can be followed here.
+            source = source.split('.')[0]
+            lookup_type = _get_related_lookup_type(model, source)
+            if lookup_type == 'select':
+                select_related.append(source)
+            elif lookup_type == 'prefetch':
+                prefetch_related.append(source)
+
+    lookups = (tuple(sorted(select_related)), tuple(sorted(prefetch_related)))
+    _serializer_related_lookups[serializer_class] = lookups
+    return lookups
+
+
 def get_virtual_field(model, field_name):
     matched_fields = filter(
         lambda f: f.name == field_name,
@@ -129,6 +384,7 @@ def camel_case_to_snake_case(value):
     return re.sub('([a-z0-9])([A-Z])', r'\1_\2', s1).lower()
 
 
+@cache_relation_lookup
 def compute_default_url_kwarg_for_parent(parent_model, child_model):
     """
     Given a `parent_model` and a `child_model` which
@@ -194,39 +450,44 @@ def get_all_virtual_relations(model):
     return [field.rel for field in generic_relations]
 
 
-def find_parent_to_child_manager(parent_obj, child_model):
+@cache_relation_lookup
+def find_parent_to_child_manager_attr(parent_model, child_model):
+    """
+    Given a `parent_model` and a `child_model`, return the name of the
+    attribute on instances of `parent_model` which holds the manager for the
+    related `child_model` instances.
+    """
     def is_relation_to_child_model(rel):
         if isinstance(rel, GenericRel):
             return issubclass(rel.to, child_model)
         if isinstance(rel, RelatedObject):
-            if isinstance(parent_obj, rel.parent_model) and issubclass(rel.model, child_model):
+            if issubclass(parent_model, rel.parent_model) and issubclass(rel.model, child_model):
                 return True
             # reverse
             if issubclass(rel.parent_model, child_model):
-                if isinstance(parent_obj, rel.model):
+                if issubclass(parent_model, rel.model):
                     return True
         else:
             assert False, "This code path should not be possible"
 
-    related_objects = filter(
-        is_relation_to_child_model,
-        itertools.chain(
+    related_objects = [
+        rel for rel in itertools.chain(
             # ForeignKey relations
-            parent_obj._meta.get_all_related_objects(),
+            parent_model._meta.get_all_related_objects(),
             # GenericForeignKey relations
-            get_all_virtual_relations(parent_obj),
+            get_all_virtual_relations(parent_model),
             # ManyToMany relations
-            parent_obj._meta.get_all_related_many_to_many_objects(),
+            parent_model._meta.get_all_related_many_to_many_objects(),
             # ManyToMany relations (from the other model)
             child_model._meta.get_all_related_many_to_many_objects(),
-        )
-    )
+        ) if is_relation_to_child_model(rel)
+    ]
     if len(set(related_objects)) < 1:
         raise ImproperlyConfigured(
             "Unable to find manager from {!r} to {!r}.  You may need to declare "
             "`parent_to_child_manager_attr` on your view if the manager is in a "
             "custom location.".format(
-                parent_obj.__class__, child_model,
+                parent_model, child_model,
             )
         )
     elif len(set(related_objects)) > 1:
@@ -235,19 +496,27 @@ def find_parent_to_child_manager(parent_obj, child_model):
             "from {!r} to {!r}.  You may need to declare "
             "`parent_to_child_manager_attr` on your view.  Found related objects "
             "{!r}".format(
-                parent_obj.__class__, child_model, related_objects,
+                parent_model, child_model, related_objects,
             )
         )
 
     rel = related_objects[0]
 
     if isinstance(rel, GenericRel):
-        return getattr(parent_obj, rel.field.attname)
+        return rel.field.attname
     elif issubclass(rel.model, child_model):
         if rel.model == rel.parent_model:
             # Self referencing ManyToManyField
-            return getattr(parent_obj, rel.field.attname)
+            return rel.field.attname
         else:
-            return getattr(parent_obj, rel.get_accessor_name())
-    elif isinstance(parent_obj, rel.model):
-        return getattr(parent_obj, rel.field.attname)
+            return rel.get_accessor_name()
+    elif issubclass(parent_model, rel.model):
+        return rel.field.attname
+
+
+def find_parent_to_child_manager(parent_obj, child_model):
+    manager_attr = find_parent_to_child_manager_attr(
+        parent_model=parent_obj.__class__,
+        child_model=child_model,
+    )
+    return getattr(parent_obj, manager_attr)
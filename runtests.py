@@ -1,4 +1,8 @@
+import os
 import sys
+import tempfile
+
+database_dir = tempfile.mkdtemp()
 
 try:
     from django.conf import settings
@@ -9,7 +13,14 @@ try:
         DATABASES={
             "default": {
                 "ENGINE": "django.db.backends.sqlite3",
-            }
+            },
+            # Unlike an in-memory database, a database file is shared by the
+            # connections of every thread.
+            "file": {
+                "ENGINE": "django.db.backends.sqlite3",
+                "NAME": os.path.join(database_dir, "file.sqlite3"),
+                "TEST_NAME": os.path.join(database_dir, "test_file.sqlite3"),
+            },
         },
         ROOT_URLCONF="tests.urls",
         INSTALLED_APPS=[
@@ -20,6 +31,7 @@ try:
             "tests",
         ],
         SITE_ID=1,
+        DRF_NESTED_RESOURCE_ROUTERS=['tests.urls.router'],
         NOSE_ARGS=['-s'],
     )
 
@@ -41,7 +53,9 @@ def run_tests(*test_args):
         test_args = ['tests']
 
     # Run tests
-    test_runner = NoseTestSuiteRunner(verbosity=1)
+    # django-nose opens the test database file before it is created, so the
+    # runner must not ask whether to delete it.
+    test_runner = NoseTestSuiteRunner(verbosity=1, interactive=False)
 
     failures = test_runner.run_tests(test_args)
 
@@ -16,6 +16,18 @@ class TargetModel(models.Model):
 
 class ForeignKeySourceModel(models.Model):
     target = models.ForeignKey(TargetModel, related_name='sources')
+    name = models.CharField(max_length=255, blank=True)
+
+
+class TimestampedSourceModel(models.Model):
+    target = models.ForeignKey(TargetModel, related_name='timestamped_sources')
+    name = models.CharField(max_length=255, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+class DoubleForeignKeySourceModel(models.Model):
+    primary_target = models.ForeignKey(TargetModel, related_name='primary_sources')
+    secondary_target = models.ForeignKey(TargetModel, related_name='secondary_sources')
 
 
 class ShortenPermissionsNameMeta:
@@ -56,8 +68,27 @@ class SelfReferencingManyToManyModel(models.Model):
         pass
 
 
+class NonSymmetricalSelfReferencingModel(models.Model):
+    targets = models.ManyToManyField('self', symmetrical=False, related_name='sources')
+
+    class Meta(ShortenPermissionsNameMeta):
+        pass
+
+
 class ManyToManyTowardsSelfReference(models.Model):
     targets = models.ManyToManyField(SelfReferencingManyToManyModel)
 
     class Meta(ShortenPermissionsNameMeta):
         pass
+
+
+class OrganizationModel(models.Model):
+    pass
+
+
+class SiteModel(models.Model):
+    organization = models.ForeignKey(OrganizationModel, related_name='sites')
+
+
+class MeterModel(models.Model):
+    site = models.ForeignKey(SiteModel, related_name='meters')
@@ -0,0 +1,155 @@
+import json
+
+import mock
+
+from django.test import TestCase
+from django.core.urlresolvers import reverse
+
+from rest_framework import status
+
+from drf_nested_resource.cache import ChildAggregateCache
+
+from tests.models import (
+    TargetModel,
+    ForeignKeySourceModel,
+    ManyToManyTargetModel,
+    ManyToManySourceModel,
+)
+from tests.views import (
+    AggregateNestedForeignKeySourceModelViewSet,
+    BulkAggregateNestedForeignKeySourceModelViewSet,
+)
+
+
+class ChildAggregatesTest(TestCase):
+    def setUp(self):
+        AggregateNestedForeignKeySourceModelViewSet.child_aggregate_cache.backend.clear()
+
+    def test_children_are_counted_in_a_single_query(self):
+        target = TargetModel.objects.create()
+        ForeignKeySourceModel.objects.create(target=target, name='a')
+        ForeignKeySourceModel.objects.create(target=target, name='b')
+        ForeignKeySourceModel.objects.create(target=TargetModel.objects.create())
+        url = reverse('aggregate-sources-count', kwargs={'target_pk': target.pk})
+
+        # One query for the parent and one for the aggregates.
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+
+        self.assertEqual(
+            response.status_code, status.HTTP_200_OK, msg=response.data,
+        )
+        self.assertEqual(response.data, {'count': 2, 'last_name': 'b'})
+
+    def test_cached_aggregates_are_reused_until_children_change(self):
+        target = TargetModel.objects.create()
+        ForeignKeySourceModel.objects.create(target=target)
+        url = reverse('aggregate-sources-count', kwargs={'target_pk': target.pk})
+        self.client.get(url)
+
+        # Only the parent is queried.
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.data['count'], 1)
+
+        ForeignKeySourceModel.objects.create(target=target)
+
+        response = self.client.get(url)
+        self.assertEqual(response.data['count'], 2)
+
+    def test_aggregates_of_children_changed_while_counted_are_not_cached(self):
+        target = TargetModel.objects.create()
+        url = reverse('aggregate-sources-count', kwargs={'target_pk': target.pk})
+        get_child_aggregates = AggregateNestedForeignKeySourceModelViewSet.get_child_aggregates
+
+        def count_while_children_change(view, queryset):
+            data = get_child_aggregates(view, queryset)
+            ForeignKeySourceModel.objects.create(target=target)
+            return data
+
+        with mock.patch.object(
+            AggregateNestedForeignKeySourceModelViewSet, 'get_child_aggregates',
+            autospec=True, side_effect=count_while_children_change,
+        ):
+            self.assertEqual(self.client.get(url).data['count'], 0)
+
+        self.assertEqual(self.client.get(url).data['count'], 1)
+
+    def test_404_when_parent_does_not_exist(self):
+        url = reverse('aggregate-sources-count', kwargs={'target_pk': 1234})
+
+        response = self.client.get(url)
+
+        self.assertEqual(
+            response.status_code, status.HTTP_404_NOT_FOUND, msg=response.data,
+        )
+
+
+class BulkWriteChildAggregatesTest(TestCase):
+    def setUp(self):
+        BulkAggregateNestedForeignKeySourceModelViewSet.child_aggregate_cache.backend.clear()
+        self.target = TargetModel.objects.create()
+        self.count_url = reverse(
+            'bulk-aggregate-sources-count', kwargs={'target_pk': self.target.pk},
+        )
+        self.list_url = reverse(
+            'bulk-aggregate-sources-list', kwargs={'target_pk': self.target.pk},
+        )
+
+    def test_bulk_create_invalidates_cached_aggregates(self):
+        self.assertEqual(self.client.get(self.count_url).data['count'], 0)
+
+        response = self.client.post(
+            self.list_url, json.dumps([{'name': 'a'}, {'name': 'b'}]),
+            content_type='application/json',
+        )
+        self.assertEqual(
+            response.status_code, status.HTTP_201_CREATED, msg=response.data,
+        )
+
+        self.assertEqual(self.client.get(self.count_url).data['count'], 2)
+
+    def test_bulk_update_invalidates_cached_aggregates(self):
+        source = ForeignKeySourceModel.objects.create(target=self.target, name='a')
+        self.assertEqual(self.client.get(self.count_url).data['last_name'], 'a')
+
+        response = self.client.patch(
+            '{0}?id__in={1}'.format(self.list_url, source.pk),
+            json.dumps({'name': 'b'}), content_type='application/json',
+        )
+        self.assertEqual(
+            response.status_code, status.HTTP_200_OK, msg=response.data,
+        )
+
+        self.assertEqual(self.client.get(self.count_url).data['last_name'], 'b')
+
+
+class ChildAggregateCacheTest(TestCase):
+    def test_many_to_many_changes_invalidate_the_child_model(self):
+        cache = ChildAggregateCache()
+        target = ManyToManyTargetModel.objects.create()
+        source = ManyToManySourceModel.objects.create()
+        cache.set(ManyToManySourceModel, {'pk': target.pk}, {'count': 0})
+
+        target.sources.add(source)
+
+        self.assertIsNone(cache.get(ManyToManySourceModel, {'pk': target.pk}))
+
+    def test_many_to_many_writes_through_either_manager(self):
+        cache = ChildAggregateCache()
+        target = ManyToManyTargetModel.objects.create()
+        source = ManyToManySourceModel.objects.create()
+        cache.watch(ManyToManySourceModel)
+
+        source.targets.add(target)
+        self.assertEqual(list(target.sources.all()), [source])
+
+        cache.set(ManyToManySourceModel, {'pk': target.pk}, {'count': 1})
+        source.targets.remove(target)
+        self.assertIsNone(cache.get(ManyToManySourceModel, {'pk': target.pk}))
+
+        source.targets.add(target)
+        cache.set(ManyToManySourceModel, {'pk': target.pk}, {'count': 1})
+        target.sources.clear()
+        self.assertIsNone(cache.get(ManyToManySourceModel, {'pk': target.pk}))
+        self.assertFalse(source.targets.exists())
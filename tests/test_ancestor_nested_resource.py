@@ -0,0 +1,75 @@
+from django.test import TestCase
+from django.core.urlresolvers import reverse
+
+from rest_framework import status
+
+from tests.models import (
+    OrganizationModel,
+    SiteModel,
+    MeterModel,
+)
+from tests.views import NestedMeterModelViewSet
+
+
+class AncestorNestedResourceTest(TestCase):
+    """
+    Test nested resources which are nested more than one level deep,
+    /organizations/<organization_pk>/sites/<site_pk>/meters/
+    """
+    def setUp(self):
+        self.organization = OrganizationModel.objects.create()
+        self.site = SiteModel.objects.create(organization=self.organization)
+        self.meters = [
+            MeterModel.objects.create(site=self.site) for i in range(3)
+        ]
+
+    def test_ancestor_lookups(self):
+        self.assertEqual(
+            NestedMeterModelViewSet().get_ancestor_lookups(),
+            [('organization_pk', 'organization__pk')],
+        )
+
+    def test_list_checks_whole_chain_in_one_query(self):
+        url = reverse('nested-meters-list', kwargs={
+            'organization_pk': self.organization.pk,
+            'site_pk': self.site.pk,
+        })
+
+        # One query for the site and organization, and one for the meters.
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+
+        self.assertEqual(
+            response.status_code, status.HTTP_200_OK, msg=response.data,
+        )
+        self.assertEqual(
+            set(obj['id'] for obj in response.data),
+            set(meter.pk for meter in self.meters),
+        )
+
+    def test_404_when_parent_is_not_related_to_ancestor(self):
+        other_organization = OrganizationModel.objects.create()
+        url = reverse('nested-meters-list', kwargs={
+            'organization_pk': other_organization.pk,
+            'site_pk': self.site.pk,
+        })
+
+        response = self.client.get(url)
+
+        self.assertEqual(
+            response.status_code, status.HTTP_404_NOT_FOUND, msg=response.data,
+        )
+
+    def test_404_on_detail_when_parent_is_not_related_to_ancestor(self):
+        other_organization = OrganizationModel.objects.create()
+        url = reverse('nested-meters-detail', kwargs={
+            'organization_pk': other_organization.pk,
+            'site_pk': self.site.pk,
+            'pk': self.meters[0].pk,
+        })
+
+        response = self.client.get(url)
+
+        self.assertEqual(
+            response.status_code, status.HTTP_404_NOT_FOUND, msg=response.data,
+        )
@@ -0,0 +1,33 @@
+import mock
+
+from django.test import TestCase
+
+from benchmarks import run as benchmarks_run
+from benchmarks.scenarios import SCENARIOS
+
+
+class BenchmarksSmokeTest(TestCase):
+    """
+    Test that the views of every benchmark scenario can be built and
+    requested, with the smallest fan-out and number of requests.
+    """
+    def test_every_scenario_runs(self):
+        with self.settings(ROOT_URLCONF='benchmarks.urls'):
+            with mock.patch.object(benchmarks_run, 'print_result'):
+                results = benchmarks_run.run(
+                    scenarios=SCENARIOS,
+                    fanouts=[2],
+                    actions=['list', 'retrieve', 'create'],
+                    requests=1,
+                )
+
+        expected = set(
+            (scenario.name, action, view)
+            for scenario in SCENARIOS
+            for action in scenario.actions
+            for view in ('plain', 'nested')
+        )
+        self.assertEqual(
+            set((result['scenario'], result['action'], result['view']) for result in results),
+            expected,
+        )
@@ -0,0 +1,286 @@
+import json
+
+import mock
+
+from django.test import TestCase
+from django.core.urlresolvers import reverse
+
+from rest_framework import permissions, status
+
+from tests.models import (
+    TargetModel,
+    ForeignKeySourceModel,
+    ManyToManyTargetModel,
+    ManyToManySourceModel,
+)
+from tests.views import BulkNestedForeignKeySourceModelViewSet
+
+
+class BulkCreateNestedResourceTest(TestCase):
+    def post_json(self, url, data):
+        return self.client.post(
+            url, json.dumps(data), content_type='application/json',
+        )
+
+    def test_list_of_children_is_created_under_parent(self):
+        target = TargetModel.objects.create()
+        url = reverse('bulk-sources-list', kwargs={'target_pk': target.pk})
+
+        # One query for the parent, one to lock it, one for its last child,
+        # one insert per batch of two and one to read the primary keys of the
+        # new children.
+        with self.assertNumQueries(6):
+            response = self.post_json(url, [{}, {}, {'target': target.pk}])
+
+        self.assertEqual(
+            response.status_code, status.HTTP_201_CREATED, msg=response.data,
+        )
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(target.sources.count(), 3)
+
+    def test_primary_keys_of_new_children_are_returned(self):
+        target = TargetModel.objects.create()
+        ForeignKeySourceModel.objects.create(target=target, name='existing')
+        url = reverse('bulk-sources-list', kwargs={'target_pk': target.pk})
+
+        response = self.post_json(url, [{'name': 'a'}, {'name': 'b'}, {'name': 'c'}])
+
+        self.assertEqual(
+            response.status_code, status.HTTP_201_CREATED, msg=response.data,
+        )
+        for obj in response.data:
+            self.assertEqual(
+                ForeignKeySourceModel.objects.get(pk=obj['id']).name, obj['name'],
+            )
+
+    def test_primary_keys_are_not_guessed_when_other_children_are_added(self):
+        target = TargetModel.objects.create()
+        url = reverse('bulk-sources-list', kwargs={'target_pk': target.pk})
+        manager = ForeignKeySourceModel._default_manager
+        bulk_create = manager.bulk_create
+
+        def bulk_create_alongside_other_writer(*args, **kwargs):
+            bulk_create(*args, **kwargs)
+            ForeignKeySourceModel.objects.create(target=target, name='other')
+
+        with mock.patch.object(
+            manager, 'bulk_create', side_effect=bulk_create_alongside_other_writer,
+        ):
+            response = self.post_json(url, [{'name': 'a'}, {'name': 'b'}])
+
+        self.assertEqual(
+            response.status_code, status.HTTP_201_CREATED, msg=response.data,
+        )
+        self.assertEqual([obj['id'] for obj in response.data], [None, None])
+        self.assertEqual(target.sources.count(), 3)
+
+    def test_post_save_is_called_for_each_child(self):
+        target = TargetModel.objects.create()
+        url = reverse('bulk-sources-list', kwargs={'target_pk': target.pk})
+
+        with mock.patch.object(
+            BulkNestedForeignKeySourceModelViewSet, 'post_save',
+        ) as post_save:
+            self.post_json(url, [{}, {}])
+
+        self.assertEqual(post_save.call_count, 2)
+        for args, kwargs in post_save.call_args_list:
+            self.assertIsNotNone(args[0].pk)
+            self.assertEqual(kwargs, {'created': True})
+
+    def test_many_to_many_children_are_rejected(self):
+        target = ManyToManyTargetModel.objects.create()
+        url = reverse('bulk-m2m-sources-list', kwargs={'target_pk': target.pk})
+
+        response = self.post_json(url, [{}, {}])
+
+        self.assertEqual(
+            response.status_code, status.HTTP_400_BAD_REQUEST, msg=response.data,
+        )
+        self.assertFalse(ManyToManySourceModel.objects.exists())
+
+    def test_children_referencing_other_parent_are_rejected(self):
+        target_a = TargetModel.objects.create()
+        target_b = TargetModel.objects.create()
+        url = reverse('bulk-sources-list', kwargs={'target_pk': target_a.pk})
+
+        response = self.post_json(url, [{}, {'target': target_b.pk}])
+
+        self.assertEqual(
+            response.status_code, status.HTTP_400_BAD_REQUEST, msg=response.data,
+        )
+        self.assertFalse(ForeignKeySourceModel.objects.exists())
+
+    def test_children_which_are_not_objects_are_rejected(self):
+        target = TargetModel.objects.create()
+        url = reverse('bulk-sources-list', kwargs={'target_pk': target.pk})
+
+        response = self.post_json(url, [1, 2])
+
+        self.assertEqual(
+            response.status_code, status.HTTP_400_BAD_REQUEST, msg=response.data,
+        )
+        self.assertFalse(ForeignKeySourceModel.objects.exists())
+
+    def test_404_when_parent_does_not_exist(self):
+        url = reverse('bulk-sources-list', kwargs={'target_pk': 1234})
+
+        response = self.post_json(url, [{}, {}])
+
+        self.assertEqual(
+            response.status_code, status.HTTP_404_NOT_FOUND, msg=response.data,
+        )
+        self.assertFalse(ForeignKeySourceModel.objects.exists())
+
+    def test_single_child_is_still_created(self):
+        target = TargetModel.objects.create()
+        url = reverse('bulk-sources-list', kwargs={'target_pk': target.pk})
+
+        response = self.post_json(url, {})
+
+        self.assertEqual(
+            response.status_code, status.HTTP_201_CREATED, msg=response.data,
+        )
+        self.assertEqual(target.sources.count(), 1)
+
+
+class DenyLockedSources(permissions.BasePermission):
+    def has_object_permission(self, request, view, obj):
+        return obj.name != 'locked'
+
+
+class BulkUpdateDestroyNestedResourceTest(TestCase):
+    def setUp(self):
+        self.target_a = TargetModel.objects.create()
+        self.target_b = TargetModel.objects.create()
+        self.sources = [
+            ForeignKeySourceModel.objects.create(target=self.target_a)
+            for i in range(3)
+        ]
+        self.other_source = ForeignKeySourceModel.objects.create(
+            target=self.target_b,
+        )
+
+    def get_url(self, target, sources):
+        return '{0}?id__in={1}'.format(
+            reverse('bulk-sources-list', kwargs={'target_pk': target.pk}),
+            ','.join(str(source.pk) for source in sources),
+        )
+
+    def test_bulk_update(self):
+        url = self.get_url(self.target_a, self.sources[:2])
+
+        response = self.client.patch(
+            url, json.dumps({'name': 'updated'}), content_type='application/json',
+        )
+
+        self.assertEqual(
+            response.status_code, status.HTTP_200_OK, msg=response.data,
+        )
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual(
+            set(ForeignKeySourceModel.objects.filter(name='updated')),
+            set(self.sources[:2]),
+        )
+
+    def test_bulk_update_is_scoped_to_parent(self):
+        url = self.get_url(self.target_a, [self.sources[0], self.other_source])
+
+        response = self.client.patch(
+            url, json.dumps({'name': 'updated'}), content_type='application/json',
+        )
+
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(
+            ForeignKeySourceModel.objects.get(pk=self.other_source.pk).name, '',
+        )
+
+    def test_bulk_update_cannot_move_children_to_other_parent(self):
+        url = self.get_url(self.target_a, self.sources)
+
+        response = self.client.patch(
+            url, json.dumps({'target': self.target_b.pk}),
+            content_type='application/json',
+        )
+
+        self.assertEqual(
+            response.status_code, status.HTTP_400_BAD_REQUEST, msg=response.data,
+        )
+        self.assertEqual(self.target_a.sources.count(), 3)
+
+    def test_bulk_destroy(self):
+        url = self.get_url(self.target_a, self.sources[:2])
+
+        response = self.client.delete(url)
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(list(self.target_a.sources.all()), self.sources[2:])
+
+    def test_bulk_destroy_is_scoped_to_parent(self):
+        url = self.get_url(self.target_a, [self.other_source])
+
+        response = self.client.delete(url)
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertTrue(
+            ForeignKeySourceModel.objects.filter(pk=self.other_source.pk).exists()
+        )
+
+    def test_bulk_update_checks_object_permissions(self):
+        ForeignKeySourceModel.objects.filter(pk=self.sources[1].pk).update(name='locked')
+        url = self.get_url(self.target_a, self.sources[:2])
+
+        with mock.patch.object(
+            BulkNestedForeignKeySourceModelViewSet, 'permission_classes',
+            [DenyLockedSources],
+        ):
+            response = self.client.patch(
+                url, json.dumps({'name': 'updated'}), content_type='application/json',
+            )
+
+        self.assertEqual(
+            response.status_code, status.HTTP_403_FORBIDDEN, msg=response.data,
+        )
+        self.assertFalse(ForeignKeySourceModel.objects.filter(name='updated').exists())
+
+    def test_bulk_destroy_checks_object_permissions(self):
+        ForeignKeySourceModel.objects.filter(pk=self.sources[1].pk).update(name='locked')
+        url = self.get_url(self.target_a, self.sources[:2])
+
+        with mock.patch.object(
+            BulkNestedForeignKeySourceModelViewSet, 'permission_classes',
+            [DenyLockedSources],
+        ):
+            response = self.client.delete(url)
+
+        self.assertEqual(
+            response.status_code, status.HTTP_403_FORBIDDEN, msg=response.data,
+        )
+        self.assertEqual(self.target_a.sources.count(), 3)
+
+    def test_lookup_query_param_is_required(self):
+        url = reverse('bulk-sources-list', kwargs={'target_pk': self.target_a.pk})
+
+        response = self.client.delete(url)
+
+        self.assertEqual(
+            response.status_code, status.HTTP_400_BAD_REQUEST, msg=response.data,
+        )
+        self.assertEqual(self.target_a.sources.count(), 3)
+
+    def test_bulk_destroy_is_not_allowed_for_many_to_many_children(self):
+        target = ManyToManyTargetModel.objects.create()
+        source = ManyToManySourceModel.objects.create()
+        source.targets.add(target)
+        url = '{0}?id__in={1}'.format(
+            reverse('bulk-m2m-sources-list', kwargs={'target_pk': target.pk}),
+            source.pk,
+        )
+
+        response = self.client.delete(url)
+
+        self.assertEqual(
+            response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED,
+            msg=response.data,
+        )
+        self.assertTrue(ManyToManySourceModel.objects.filter(pk=source.pk).exists())
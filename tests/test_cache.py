@@ -0,0 +1,167 @@
+from django.test import TestCase
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+
+from drf_nested_resource.compat import get_cache
+
+import mock
+
+from drf_nested_resource.cache import (
+    LRUCacheBackend,
+    DjangoCacheBackend,
+    ParentObjectCache,
+    MissingParentCache,
+)
+
+from tests.models import TargetModel
+from tests.views import NestedForeignKeySourceModelViewSet
+
+
+class LRUCacheBackendTest(TestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        backend = LRUCacheBackend(max_size=2)
+        backend.set('a', 1)
+        backend.set('b', 2)
+        # mark `a` as recently used.
+        backend.get('a')
+        backend.set('c', 3)
+
+        self.assertEqual(backend.get('a'), 1)
+        self.assertIsNone(backend.get('b'))
+        self.assertEqual(backend.get('c'), 3)
+
+    def test_entries_expire(self):
+        backend = LRUCacheBackend(timeout=10)
+        with mock.patch('drf_nested_resource.cache.time.time', return_value=100):
+            backend.set('a', 1)
+        with mock.patch('drf_nested_resource.cache.time.time', return_value=105):
+            self.assertEqual(backend.get('a'), 1)
+        with mock.patch('drf_nested_resource.cache.time.time', return_value=111):
+            self.assertIsNone(backend.get('a'))
+
+
+class DjangoCacheBackendTest(TestCase):
+    def setUp(self):
+        self.backend = DjangoCacheBackend()
+        self.cache = ParentObjectCache(backend=self.backend)
+        self.target = TargetModel.objects.create()
+
+    def test_clear_discards_entries(self):
+        self.cache.set(TargetModel, {'pk': self.target.pk}, self.target)
+
+        self.backend.clear()
+
+        self.assertIsNone(self.cache.get(TargetModel, {'pk': self.target.pk}))
+
+    def test_clear_keeps_other_entries_of_the_cache(self):
+        get_cache('default').set('other', 'value')
+
+        self.backend.clear()
+
+        self.assertEqual(get_cache('default').get('other'), 'value')
+
+
+class CachedParentViewSet(NestedForeignKeySourceModelViewSet):
+    parent_object_cache = ParentObjectCache()
+
+
+class DjangoCachedParentViewSet(NestedForeignKeySourceModelViewSet):
+    parent_object_cache = ParentObjectCache(backend=DjangoCacheBackend())
+
+
+class ParentObjectCacheTest(TestCase):
+    view_class = CachedParentViewSet
+
+    def setUp(self):
+        self.view_class.parent_object_cache.backend.clear()
+        self.target = TargetModel.objects.create()
+
+    def get_parent_object(self, target_pk):
+        return self.view_class(kwargs={'target_pk': target_pk}).get_parent_object()
+
+    def test_parent_is_cached_across_requests(self):
+        self.assertEqual(self.get_parent_object(self.target.pk), self.target)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_parent_object(self.target.pk), self.target)
+
+    def test_saving_parent_invalidates_cache(self):
+        self.get_parent_object(self.target.pk)
+        self.target.save()
+
+        with self.assertNumQueries(1):
+            self.get_parent_object(self.target.pk)
+
+    def test_parent_changed_while_fetched_is_not_cached(self):
+        fetch = get_object_or_404
+
+        def fetch_while_parent_changes(*args, **kwargs):
+            parent_obj = fetch(*args, **kwargs)
+            TargetModel.objects.get(pk=self.target.pk).save()
+            return parent_obj
+
+        with mock.patch(
+            'drf_nested_resource.mixins.get_object_or_404',
+            side_effect=fetch_while_parent_changes,
+        ):
+            self.get_parent_object(self.target.pk)
+
+        with self.assertNumQueries(1):
+            self.get_parent_object(self.target.pk)
+
+    def test_deleting_parent_invalidates_cache(self):
+        target_pk = self.target.pk
+        self.get_parent_object(target_pk)
+        self.target.delete()
+
+        with self.assertRaises(Http404):
+            self.get_parent_object(target_pk)
+
+    def test_lookup_kwargs_are_part_of_key(self):
+        other_target = TargetModel.objects.create()
+        self.get_parent_object(self.target.pk)
+
+        self.assertEqual(self.get_parent_object(other_target.pk), other_target)
+
+
+class DjangoCacheParentObjectCacheTest(ParentObjectCacheTest):
+    view_class = DjangoCachedParentViewSet
+
+
+class MissingParentCachedViewSet(NestedForeignKeySourceModelViewSet):
+    missing_parent_cache = MissingParentCache()
+
+
+class MissingParentCacheTest(TestCase):
+    def setUp(self):
+        MissingParentCachedViewSet.missing_parent_cache.backend.clear()
+
+    def get_parent_object(self, target_pk):
+        view = MissingParentCachedViewSet(kwargs={'target_pk': target_pk})
+        return view.get_parent_object()
+
+    def test_missing_parent_is_not_queried_again(self):
+        with self.assertRaises(Http404):
+            self.get_parent_object(1234)
+
+        with self.assertNumQueries(0):
+            with self.assertRaises(Http404):
+                self.get_parent_object(1234)
+
+    def test_creating_parent_clears_missing_parents(self):
+        with self.assertRaises(Http404):
+            self.get_parent_object(1234)
+
+        target = TargetModel.objects.create(pk=1234)
+
+        self.assertEqual(self.get_parent_object(1234), target)
+
+    def test_entries_expire(self):
+        with mock.patch('drf_nested_resource.cache.time.time', return_value=100):
+            with self.assertRaises(Http404):
+                self.get_parent_object(1234)
+
+        TargetModel.objects.bulk_create([TargetModel(pk=1234)])
+
+        with mock.patch('drf_nested_resource.cache.time.time', return_value=200):
+            self.assertEqual(self.get_parent_object(1234).pk, 1234)
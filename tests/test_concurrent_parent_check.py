@@ -0,0 +1,215 @@
+import threading
+
+from django.test import TestCase, TransactionTestCase
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.core.urlresolvers import reverse
+
+from rest_framework import status
+
+import mock
+
+from drf_nested_resource.mixins import (
+    ParentCheckPool,
+    ParentExistsCheck,
+    _can_query_concurrently,
+)
+
+from tests.models import (
+    TargetModel,
+    ForeignKeySourceModel,
+)
+
+
+class FakeParentExistsCheck(object):
+    """
+    Stands in for the background check, as a separate connection cannot see
+    the data of a test case.
+    """
+    exists = True
+
+    def __init__(self, queryset):
+        self.queryset = queryset
+        self.started = False
+
+    def start(self):
+        self.started = True
+
+    def wait(self):
+        return self.exists
+
+
+class ConcurrentParentLookupStrategyTest(TestCase):
+    def setUp(self):
+        self.target = TargetModel.objects.create()
+        self.source = ForeignKeySourceModel.objects.create(target=self.target)
+        self.url = reverse(
+            'concurrent-sources-list', kwargs={'target_pk': self.target.pk},
+        )
+
+    def test_parent_is_checked_first_inside_a_transaction(self):
+        # One query for the parent and one for the children.
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+
+        self.assertEqual(
+            response.status_code, status.HTTP_200_OK, msg=response.data,
+        )
+        self.assertEqual(len(response.data), 1)
+
+    def test_404_when_parent_does_not_exist(self):
+        url = reverse('concurrent-sources-list', kwargs={'target_pk': 1234})
+
+        response = self.client.get(url)
+
+        self.assertEqual(
+            response.status_code, status.HTTP_404_NOT_FOUND, msg=response.data,
+        )
+
+    @mock.patch('drf_nested_resource.mixins._can_query_concurrently', return_value=True)
+    @mock.patch('drf_nested_resource.mixins.ParentExistsCheck', FakeParentExistsCheck)
+    def test_children_are_read_while_parent_is_checked(self, *args):
+        # Only the children are queried on this connection.
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+
+        self.assertEqual(
+            response.status_code, status.HTTP_200_OK, msg=response.data,
+        )
+        self.assertEqual(len(response.data), 1)
+
+    @mock.patch('drf_nested_resource.mixins._can_query_concurrently', return_value=True)
+    @mock.patch('drf_nested_resource.mixins.ParentExistsCheck', FakeParentExistsCheck)
+    @mock.patch.object(FakeParentExistsCheck, 'exists', False)
+    def test_children_are_discarded_when_parent_is_missing(self, *args):
+        response = self.client.get(self.url)
+
+        self.assertEqual(
+            response.status_code, status.HTTP_404_NOT_FOUND, msg=response.data,
+        )
+
+    @mock.patch('drf_nested_resource.mixins._can_query_concurrently', return_value=True)
+    @mock.patch('drf_nested_resource.mixins.ParentExistsCheck', FakeParentExistsCheck)
+    @mock.patch.object(FakeParentExistsCheck, 'exists', False)
+    def test_detail_is_discarded_when_parent_is_missing(self, *args):
+        url = reverse(
+            'concurrent-sources-detail',
+            kwargs={'target_pk': self.target.pk, 'pk': self.source.pk},
+        )
+
+        response = self.client.get(url)
+
+        self.assertEqual(
+            response.status_code, status.HTTP_404_NOT_FOUND, msg=response.data,
+        )
+
+    def test_cannot_query_concurrently_inside_a_transaction(self):
+        self.assertFalse(_can_query_concurrently(DEFAULT_DB_ALIAS))
+
+
+class ParentExistsCheckTest(TestCase):
+    def test_result_of_the_query_is_returned(self):
+        queryset = mock.Mock(**{'exists.return_value': False})
+
+        check = ParentExistsCheck(queryset)
+        check.start()
+
+        self.assertFalse(check.wait())
+
+    def test_error_of_the_query_is_raised(self):
+        queryset = mock.Mock(**{'exists.side_effect': ValueError('boom')})
+
+        check = ParentExistsCheck(queryset)
+        check.start()
+
+        with self.assertRaises(ValueError):
+            check.wait()
+
+
+class BlockingCheck(object):
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def run(self):
+        self.started.set()
+        self.release.wait()
+
+
+class ParentCheckPoolTest(TestCase):
+    def test_size_defaults_to_the_setting(self):
+        with self.settings(DRF_NESTED_RESOURCE_PARENT_CHECK_THREADS=2):
+            self.assertEqual(ParentCheckPool().get_size(), 2)
+
+    def test_check_is_run_right_away_when_the_pool_is_backed_up(self):
+        pool = ParentCheckPool(size=1)
+        running, waiting = BlockingCheck(), BlockingCheck()
+        pool.submit(running)
+        running.started.wait()
+        pool.submit(waiting)
+        threads = []
+
+        def exists():
+            threads.append(threading.current_thread())
+            return True
+
+        queryset = mock.Mock(**{'exists.side_effect': exists})
+
+        try:
+            check = ParentExistsCheck(queryset, pool=pool)
+            check.start()
+
+            self.assertTrue(check.done.is_set())
+            self.assertEqual(threads, [threading.current_thread()])
+            self.assertTrue(check.wait())
+        finally:
+            running.release.set()
+            waiting.release.set()
+
+
+class BackgroundParentExistsCheckTest(TransactionTestCase):
+    """
+    Runs the checks against the database file, which the connections of the
+    pool's threads can see the data of.
+    """
+    multi_db = True
+
+    def setUp(self):
+        self.pool = ParentCheckPool(size=1)
+
+    def check(self, pk):
+        check = ParentExistsCheck(
+            TargetModel.objects.using('file').filter(pk=pk), pool=self.pool,
+        )
+        check.start()
+        return check.wait()
+
+    def test_can_query_concurrently(self):
+        self.assertTrue(_can_query_concurrently('file'))
+
+    def test_existing_parent_is_found(self):
+        target = TargetModel.objects.using('file').create()
+
+        self.assertTrue(self.check(target.pk))
+
+    def test_missing_parent_is_not_found(self):
+        self.assertFalse(self.check(1234))
+
+    def count_connects(self, conn_max_age):
+        target = TargetModel.objects.using('file').create()
+        wrapper_class = type(connections['file'])
+
+        with mock.patch.dict(connections.databases['file'], CONN_MAX_AGE=conn_max_age):
+            with mock.patch.object(
+                wrapper_class, 'connect', autospec=True,
+                side_effect=wrapper_class.connect,
+            ) as connect:
+                self.assertTrue(self.check(target.pk))
+                self.assertFalse(self.check(1234))
+
+        return connect.call_count
+
+    def test_connection_is_reused_by_the_next_check(self):
+        self.assertEqual(self.count_connects(conn_max_age=None), 1)
+
+    def test_connection_is_closed_after_conn_max_age(self):
+        self.assertEqual(self.count_connects(conn_max_age=0), 2)
@@ -0,0 +1,117 @@
+import datetime
+import json
+
+import mock
+
+from django.test import TestCase
+from django.utils import timezone
+from django.core.urlresolvers import reverse
+
+from rest_framework import status
+
+from tests.models import (
+    TargetModel,
+    TimestampedSourceModel,
+)
+
+
+class ConditionalNestedResourceTest(TestCase):
+    def setUp(self):
+        self.target = TargetModel.objects.create()
+        self.source = TimestampedSourceModel.objects.create(target=self.target)
+        self.list_url = reverse(
+            'conditional-sources-list', kwargs={'target_pk': self.target.pk},
+        )
+        self.detail_url = reverse(
+            'conditional-sources-detail',
+            kwargs={'target_pk': self.target.pk, 'pk': self.source.pk},
+        )
+
+    def test_list_has_validators(self):
+        response = self.client.get(self.list_url)
+
+        self.assertEqual(
+            response.status_code, status.HTTP_200_OK, msg=response.data,
+        )
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+
+    def test_matching_etag_is_not_modified_without_loading_children(self):
+        etag = self.client.get(self.list_url)['ETag']
+
+        # One query for the parent and one for the validators.
+        with self.assertNumQueries(2):
+            response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+    def test_matching_last_modified_is_not_modified(self):
+        last_modified = self.client.get(self.list_url)['Last-Modified']
+
+        response = self.client.get(
+            self.list_url, HTTP_IF_MODIFIED_SINCE=last_modified,
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_deleted_child_changes_etag(self):
+        TimestampedSourceModel.objects.create(target=self.target)
+        etag = self.client.get(self.list_url)['ETag']
+        self.source.delete()
+
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(response.data), 1)
+
+    def test_bulk_update_changes_etag(self):
+        etag = self.client.get(self.list_url)['ETag']
+        url = '{0}?id__in={1}'.format(self.list_url, self.source.pk)
+
+        later = timezone.now() + datetime.timedelta(minutes=1)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            self.client.patch(
+                url, json.dumps({'name': 'updated'}), content_type='application/json',
+            )
+
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            TimestampedSourceModel.objects.get(pk=self.source.pk).updated_at, later,
+        )
+
+    def test_other_parent_has_its_own_etag(self):
+        etag = self.client.get(self.list_url)['ETag']
+        other_target = TargetModel.objects.create()
+        TimestampedSourceModel.objects.create(target=other_target)
+        other_url = reverse(
+            'conditional-sources-list', kwargs={'target_pk': other_target.pk},
+        )
+
+        response = self.client.get(other_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_detail_matching_etag_is_not_modified(self):
+        etag = self.client.get(self.detail_url)['ETag']
+
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_detail_of_another_parent_is_404(self):
+        other_target = TargetModel.objects.create()
+        url = reverse(
+            'conditional-sources-detail',
+            kwargs={'target_pk': other_target.pk, 'pk': self.source.pk},
+        )
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH='*')
+
+        self.assertEqual(
+            response.status_code, status.HTTP_404_NOT_FOUND, msg=response.data,
+        )
@@ -0,0 +1,134 @@
+from django.test import TestCase
+from django.test.client import RequestFactory
+from django.core.urlresolvers import reverse
+
+from drf_nested_resource.instrumentation import (
+    PhaseTimer,
+    QueryBudgetExceeded,
+    nested_request_timed,
+)
+
+from tests.models import (
+    TargetModel,
+    ForeignKeySourceModel,
+)
+from tests.views import InstrumentedNestedForeignKeySourceModelViewSet
+
+
+class PhaseTimerTest(TestCase):
+    def test_nested_phases_are_only_counted_once(self):
+        timer = PhaseTimer()
+        with self.settings(DEBUG=True):
+            with timer.record('view'):
+                TargetModel.objects.count()
+                with timer.record('parent'):
+                    TargetModel.objects.count()
+                    TargetModel.objects.count()
+
+        self.assertEqual(timer.timings['view']['queries'], 1)
+        self.assertEqual(timer.timings['parent']['queries'], 2)
+        self.assertEqual(timer.total_queries, 3)
+        self.assertLessEqual(
+            timer.timings['parent']['duration'], timer.total_duration,
+        )
+
+    def test_queries_are_not_counted_when_not_logged(self):
+        timer = PhaseTimer()
+        with self.settings(DEBUG=False):
+            with timer.record('view'):
+                TargetModel.objects.count()
+
+        self.assertIsNone(timer.timings['view']['queries'])
+        self.assertIsNone(timer.total_queries)
+
+
+class InstrumentedNestedResourceTest(TestCase):
+    def setUp(self):
+        self.target = TargetModel.objects.create()
+        ForeignKeySourceModel.objects.create(target=self.target)
+        self.url = reverse(
+            'instrumented-sources-list', kwargs={'target_pk': self.target.pk},
+        )
+
+    def test_timings_are_sent_with_signal(self):
+        received = []
+
+        def receiver(sender, view, request, timer, **kwargs):
+            received.append(timer)
+
+        nested_request_timed.connect(
+            receiver, sender=InstrumentedNestedForeignKeySourceModelViewSet,
+        )
+        try:
+            self.client.get(self.url)
+        finally:
+            nested_request_timed.disconnect(
+                receiver, sender=InstrumentedNestedForeignKeySourceModelViewSet,
+            )
+
+        self.assertEqual(len(received), 1)
+        timings = received[0].timings
+        for phase in ('view', 'parent', 'relationship', 'serializer', 'queryset'):
+            self.assertIn(phase, timings)
+
+    def get_timings(self, url):
+        received = []
+
+        def receiver(sender, view, request, timer, **kwargs):
+            received.append(timer)
+
+        nested_request_timed.connect(
+            receiver, sender=InstrumentedNestedForeignKeySourceModelViewSet,
+        )
+        try:
+            with self.settings(DEBUG=True):
+                self.client.get(url)
+        finally:
+            nested_request_timed.disconnect(
+                receiver, sender=InstrumentedNestedForeignKeySourceModelViewSet,
+            )
+        return received[0].timings
+
+    def test_children_of_a_list_are_fetched_in_their_own_phase(self):
+        timings = self.get_timings(self.url)
+
+        self.assertEqual(timings['children']['queries'], 1)
+        self.assertEqual(timings['view']['queries'], 0)
+
+    def test_child_of_a_detail_request_is_fetched_in_its_own_phase(self):
+        source = ForeignKeySourceModel.objects.get(target=self.target)
+        url = reverse(
+            'instrumented-sources-detail',
+            kwargs={'target_pk': self.target.pk, 'pk': source.pk},
+        )
+
+        timings = self.get_timings(url)
+
+        self.assertEqual(timings['children']['queries'], 1)
+        self.assertEqual(timings['view']['queries'], 0)
+
+    def test_server_timing_header(self):
+        response = self.client.get(self.url)
+
+        self.assertIn('parent;dur=', response['Server-Timing'])
+        self.assertIn('queryset;dur=', response['Server-Timing'])
+
+    def test_query_budget_is_enforced(self):
+        view = InstrumentedNestedForeignKeySourceModelViewSet.as_view(
+            {'get': 'list'}, query_budget=1,
+        )
+        request = RequestFactory().get(self.url)
+
+        # The parent and the children are two queries.
+        with self.assertRaises(QueryBudgetExceeded):
+            view(request, target_pk=self.target.pk)
+
+    def test_request_within_query_budget(self):
+        view = InstrumentedNestedForeignKeySourceModelViewSet.as_view(
+            {'get': 'list'}, query_budget=2,
+        )
+        request = RequestFactory().get(self.url)
+
+        response = view(request, target_pk=self.target.pk)
+
+        self.assertEqual(response.status_code, 200)
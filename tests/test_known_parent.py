@@ -0,0 +1,84 @@
+from django.test import TestCase
+
+from rest_framework import viewsets
+
+from drf_nested_resource.mixins import NestedResourceMixin
+
+from tests.models import (
+    TargetModel,
+    ForeignKeySourceModel,
+    DoubleForeignKeySourceModel,
+    GenericForeignKeySourceModel,
+)
+from tests.views import (
+    NestedForeignKeySourceModelViewSet,
+    NestedGenericForeignKeySourceModelViewSet,
+)
+
+
+class NestedSecondarySourceViewSet(NestedResourceMixin, viewsets.ModelViewSet):
+    parent_model = TargetModel
+    model = DoubleForeignKeySourceModel
+    parent_to_child_manager_attr = 'secondary_sources'
+    parent_url_kwarg = 'target_pk'
+
+
+class KnownParentTest(TestCase):
+    """
+    Test that the children returned by `get_queryset` reuse the parent
+    instance rather than each loading it again.
+    """
+    def test_foreign_key_children(self):
+        target = TargetModel.objects.create()
+        for i in range(3):
+            ForeignKeySourceModel.objects.create(target=target)
+        view = NestedForeignKeySourceModelViewSet(kwargs={'target_pk': target.pk})
+
+        # One query for the parent and one for the children.
+        with self.assertNumQueries(2):
+            children = list(view.get_queryset())
+            for child in children:
+                self.assertIs(child.target, view.get_parent_object())
+
+        self.assertEqual(len(children), 3)
+
+    def test_generic_foreign_key_children(self):
+        target = TargetModel.objects.create()
+        for i in range(3):
+            GenericForeignKeySourceModel.objects.create(object=target)
+        view = NestedGenericForeignKeySourceModelViewSet(
+            kwargs={'target_model_pk': target.pk},
+        )
+
+        with self.assertNumQueries(2):
+            children = list(view.get_queryset())
+            for child in children:
+                self.assertIs(child.object, view.get_parent_object())
+
+        self.assertEqual(len(children), 3)
+
+    def test_generic_foreign_key_children_through_the_url(self):
+        target = TargetModel.objects.create()
+        GenericForeignKeySourceModel.objects.create(object=target)
+        view = NestedGenericForeignKeySourceModelViewSet(
+            kwargs={'target_model_pk': target.pk},
+        )
+        child = list(view.get_queryset())[0]
+
+        self.assertEqual(child.object_id, target.pk)
+        self.assertEqual(child.content_type.model_class(), TargetModel)
+
+    def test_parent_is_set_on_the_field_followed_by_the_manager(self):
+        target = TargetModel.objects.create()
+        other_target = TargetModel.objects.create()
+        DoubleForeignKeySourceModel.objects.create(
+            primary_target=other_target, secondary_target=target,
+        )
+        view = NestedSecondarySourceViewSet(kwargs={'target_pk': target.pk})
+
+        children = list(view.get_queryset())
+
+        self.assertEqual(len(children), 1)
+        with self.assertNumQueries(0):
+            self.assertIs(children[0].secondary_target, view.get_parent_object())
+        self.assertEqual(children[0].primary_target, other_target)
@@ -0,0 +1,101 @@
+from django.test import TestCase
+from django.core.urlresolvers import reverse
+
+from rest_framework import status
+
+from tests.models import (
+    TargetModel,
+    ForeignKeySourceModel,
+    GenericForeignKeySourceModel,
+    ManyToManyTargetModel,
+    ManyToManySourceModel,
+)
+
+
+class KeysetPaginationTest(TestCase):
+    def walk_pages(self, url):
+        pks = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(
+                response.status_code, status.HTTP_200_OK, msg=response.data,
+            )
+            self.assertNotIn('count', response.data)
+            pks.extend(child['id'] for child in response.data['results'])
+            url = response.data['next']
+        return pks
+
+    def test_foreign_key_children_are_paged_by_pk(self):
+        target = TargetModel.objects.create()
+        other_target = TargetModel.objects.create()
+        sources = [ForeignKeySourceModel.objects.create(target=target) for _ in range(5)]
+        ForeignKeySourceModel.objects.create(target=other_target)
+        url = reverse('keyset-sources-list', kwargs={'target_pk': target.pk})
+
+        self.assertEqual(self.walk_pages(url), [source.pk for source in sources])
+
+    def test_generic_foreign_key_children_are_paged_by_pk(self):
+        target = TargetModel.objects.create()
+        sources = [GenericForeignKeySourceModel.objects.create(object=target) for _ in range(3)]
+        GenericForeignKeySourceModel.objects.create(object=TargetModel.objects.create())
+        url = reverse('keyset-generic-sources-list', kwargs={'target_model_pk': target.pk})
+
+        self.assertEqual(self.walk_pages(url), [source.pk for source in sources])
+
+    def test_many_to_many_children_are_paged_by_pk(self):
+        target = ManyToManyTargetModel.objects.create()
+        sources = [ManyToManySourceModel.objects.create() for _ in range(3)]
+        for source in sources:
+            source.targets.add(target)
+        ManyToManySourceModel.objects.create()
+        url = reverse('keyset-m2m-sources-list', kwargs={'target_pk': target.pk})
+
+        self.assertEqual(self.walk_pages(url), [source.pk for source in sources])
+
+    def test_page_does_not_count_children(self):
+        target = TargetModel.objects.create()
+        for _ in range(5):
+            ForeignKeySourceModel.objects.create(target=target)
+        url = reverse('keyset-sources-list', kwargs={'target_pk': target.pk})
+
+        # One query for the parent and one for the page.
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_cursor_for_another_parent_is_rejected(self):
+        target = TargetModel.objects.create()
+        other_target = TargetModel.objects.create()
+        for _ in range(3):
+            ForeignKeySourceModel.objects.create(target=target)
+            ForeignKeySourceModel.objects.create(target=other_target)
+        url = reverse('keyset-sources-list', kwargs={'target_pk': target.pk})
+        cursor = self.client.get(url).data['next'].split('cursor=')[1]
+
+        other_url = reverse('keyset-sources-list', kwargs={'target_pk': other_target.pk})
+        response = self.client.get(other_url, {'cursor': cursor})
+
+        self.assertEqual(
+            response.status_code, status.HTTP_400_BAD_REQUEST, msg=response.data,
+        )
+
+    def test_tampered_cursor_is_rejected(self):
+        target = TargetModel.objects.create()
+        url = reverse('keyset-sources-list', kwargs={'target_pk': target.pk})
+
+        response = self.client.get(url, {'cursor': 'not-a-cursor'})
+
+        self.assertEqual(
+            response.status_code, status.HTTP_400_BAD_REQUEST, msg=response.data,
+        )
+
+    def test_404_when_parent_does_not_exist(self):
+        url = reverse('keyset-sources-list', kwargs={'target_pk': 1234})
+
+        response = self.client.get(url)
+
+        self.assertEqual(
+            response.status_code, status.HTTP_404_NOT_FOUND, msg=response.data,
+        )
@@ -0,0 +1,242 @@
+from django.test import TestCase
+from django.http import Http404
+from django.core.urlresolvers import reverse
+
+from rest_framework import status, viewsets
+
+from drf_nested_resource.mixins import (
+    NestedResourceMixin,
+    PARENT_LOOKUP_FETCH,
+    PARENT_LOOKUP_EXISTS,
+    PARENT_LOOKUP_JOIN,
+)
+
+from tests.models import (
+    TargetModel,
+    ForeignKeySourceModel,
+    GenericForeignKeySourceModel,
+    ManyToManyTargetModel,
+    ManyToManySourceModel,
+    NonSymmetricalSelfReferencingModel,
+)
+from tests.views import (
+    NestedForeignKeySourceModelViewSet,
+    NestedGenericForeignKeySourceModelViewSet,
+    NestedManyToManySourceModelViewSet,
+    NestedManyToManyTargetModelViewSet,
+)
+
+
+class ExistsForeignKeySourceModelViewSet(NestedForeignKeySourceModelViewSet):
+    parent_lookup_strategy = PARENT_LOOKUP_EXISTS
+
+
+class ExistsGenericForeignKeySourceModelViewSet(NestedGenericForeignKeySourceModelViewSet):
+    parent_lookup_strategy = PARENT_LOOKUP_EXISTS
+
+
+class ExistsManyToManySourceModelViewSet(NestedManyToManySourceModelViewSet):
+    parent_lookup_strategy = PARENT_LOOKUP_EXISTS
+
+
+class ExistsManyToManyTargetModelViewSet(NestedManyToManyTargetModelViewSet):
+    parent_lookup_strategy = PARENT_LOOKUP_EXISTS
+
+
+class ExistsParentLookupStrategyTest(TestCase):
+    """
+    Test that the `PARENT_LOOKUP_EXISTS` strategy returns the same children as
+    the default strategy without loading the parent instance.
+    """
+    def assertChildrenEqual(self, view_class, url_kwarg, parent, children,
+                            num_queries=2):
+        view = view_class(kwargs={url_kwarg: parent.pk})
+        with self.assertNumQueries(num_queries):
+            returned_pks = set(obj.pk for obj in view.get_queryset())
+        self.assertEqual(returned_pks, set(child.pk for child in children))
+
+    def test_foreign_key_relationship(self):
+        target_a = TargetModel.objects.create()
+        target_b = TargetModel.objects.create()
+        sources = [
+            ForeignKeySourceModel.objects.create(target=target_a)
+            for i in range(3)
+        ]
+        ForeignKeySourceModel.objects.create(target=target_b)
+
+        self.assertChildrenEqual(
+            ExistsForeignKeySourceModelViewSet, 'target_pk', target_a, sources,
+        )
+
+    def test_generic_foreign_key_relationship(self):
+        target_a = TargetModel.objects.create()
+        target_b = TargetModel.objects.create()
+        sources = [
+            GenericForeignKeySourceModel.objects.create(object=target_a)
+            for i in range(3)
+        ]
+        GenericForeignKeySourceModel.objects.create(object=target_b)
+
+        # Warm the content type cache so the query count is stable.
+        ExistsGenericForeignKeySourceModelViewSet(
+            kwargs={'target_model_pk': target_b.pk},
+        ).get_child_queryset()
+
+        self.assertChildrenEqual(
+            ExistsGenericForeignKeySourceModelViewSet, 'target_model_pk',
+            target_a, sources,
+        )
+
+    def test_many_to_many_relationship(self):
+        target_a = ManyToManyTargetModel.objects.create()
+        target_b = ManyToManyTargetModel.objects.create()
+        source_a = ManyToManySourceModel.objects.create()
+        source_b = ManyToManySourceModel.objects.create()
+        source_c = ManyToManySourceModel.objects.create()
+        target_a.sources.add(source_a, source_b)
+        target_b.sources.add(source_b, source_c)
+
+        # The default serializer renders `targets`, so they are prefetched
+        # along with the children rather than fetched for each child when
+        # the children are serialized.
+        self.assertChildrenEqual(
+            ExistsManyToManySourceModelViewSet, 'target_pk',
+            target_a, [source_a, source_b], num_queries=3,
+        )
+
+    def test_many_to_many_relationship_from_other_side(self):
+        source_a = ManyToManySourceModel.objects.create()
+        source_b = ManyToManySourceModel.objects.create()
+        target_a = ManyToManyTargetModel.objects.create()
+        target_b = ManyToManyTargetModel.objects.create()
+        source_a.targets.add(target_a, target_b)
+        source_b.targets.add(target_b)
+
+        self.assertChildrenEqual(
+            ExistsManyToManyTargetModelViewSet, 'source_pk',
+            source_a, [target_a, target_b],
+        )
+
+    def test_404_when_parent_does_not_exist(self):
+        view = ExistsForeignKeySourceModelViewSet(kwargs={'target_pk': 1234})
+        with self.assertRaises(Http404):
+            view.get_queryset()
+
+
+class JoinParentLookupStrategyTest(TestCase):
+    """
+    Test that the `PARENT_LOOKUP_JOIN` strategy lists the children in a single
+    query and still returns a 404 when the parent does not exist.
+    """
+    def test_list_uses_a_single_query(self):
+        target_a = TargetModel.objects.create()
+        target_b = TargetModel.objects.create()
+        sources = [
+            ForeignKeySourceModel.objects.create(target=target_a)
+            for i in range(3)
+        ]
+        ForeignKeySourceModel.objects.create(target=target_b)
+
+        url = reverse('joined-sources-list', kwargs={'target_pk': target_a.pk})
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(
+            response.status_code, status.HTTP_200_OK, msg=response.data,
+        )
+        self.assertEqual(
+            set(obj['id'] for obj in response.data),
+            set(source.pk for source in sources),
+        )
+
+    def test_empty_list_for_existing_parent(self):
+        target = TargetModel.objects.create()
+
+        url = reverse('joined-sources-list', kwargs={'target_pk': target.pk})
+        response = self.client.get(url)
+        self.assertEqual(
+            response.status_code, status.HTTP_200_OK, msg=response.data,
+        )
+        self.assertEqual(response.data, [])
+
+    def test_404_on_list_when_parent_does_not_exist(self):
+        url = reverse('joined-sources-list', kwargs={'target_pk': 1234})
+        response = self.client.get(url)
+        self.assertEqual(
+            response.status_code, status.HTTP_404_NOT_FOUND, msg=response.data,
+        )
+
+    def test_404_on_detail_request_for_non_related_instances(self):
+        target_a = TargetModel.objects.create()
+        target_b = TargetModel.objects.create()
+        source = ForeignKeySourceModel.objects.create(target=target_a)
+
+        url = reverse(
+            'joined-sources-detail',
+            kwargs={'target_pk': target_b.pk, 'pk': source.pk},
+        )
+        response = self.client.get(url)
+        self.assertEqual(
+            response.status_code, status.HTTP_404_NOT_FOUND, msg=response.data,
+        )
+
+    def test_generic_foreign_key_relationship(self):
+        target_a = TargetModel.objects.create()
+        target_b = TargetModel.objects.create()
+        source = GenericForeignKeySourceModel.objects.create(object=target_a)
+        GenericForeignKeySourceModel.objects.create(object=target_b)
+
+        url = reverse(
+            'joined-generic-sources-list',
+            kwargs={'target_model_pk': target_a.pk},
+        )
+        response = self.client.get(url)
+        self.assertEqual(
+            response.status_code, status.HTTP_200_OK, msg=response.data,
+        )
+        self.assertEqual([obj['id'] for obj in response.data], [source.pk])
+
+    def test_many_to_many_relationship_from_other_side(self):
+        source_a = ManyToManySourceModel.objects.create()
+        source_b = ManyToManySourceModel.objects.create()
+        target_a = ManyToManyTargetModel.objects.create()
+        target_b = ManyToManyTargetModel.objects.create()
+        source_a.targets.add(target_a)
+        source_b.targets.add(target_b)
+
+        url = reverse('joined-m2m-targets-list', kwargs={'source_pk': source_a.pk})
+        response = self.client.get(url)
+        self.assertEqual(
+            response.status_code, status.HTTP_200_OK, msg=response.data,
+        )
+        self.assertEqual([obj['id'] for obj in response.data], [target_a.pk])
+
+
+class NonSymmetricalSelfReferencingViewSet(NestedResourceMixin,
+                                           viewsets.ReadOnlyModelViewSet):
+    parent_model = NonSymmetricalSelfReferencingModel
+    model = NonSymmetricalSelfReferencingModel
+    parent_url_kwarg = 'parent_pk'
+
+
+class NonSymmetricalSelfReferencingStrategyTest(TestCase):
+    """
+    Test that every strategy lists the objects the parent points to, as its
+    related manager does, rather than the objects which point to it.
+    """
+    def test_children_are_the_objects_the_parent_points_to(self):
+        a = NonSymmetricalSelfReferencingModel.objects.create()
+        b = NonSymmetricalSelfReferencingModel.objects.create()
+        c = NonSymmetricalSelfReferencingModel.objects.create()
+        a.targets.add(b)
+        c.targets.add(a)
+
+        for strategy in (PARENT_LOOKUP_FETCH, PARENT_LOOKUP_EXISTS, PARENT_LOOKUP_JOIN):
+            view_class = type(
+                'NonSymmetricalSelfReferencingViewSet',
+                (NonSymmetricalSelfReferencingViewSet,),
+                {'parent_lookup_strategy': strategy},
+            )
+            view = view_class(kwargs={'parent_pk': a.pk})
+            self.assertEqual(
+                [obj.pk for obj in view.get_queryset()], [b.pk], msg=strategy,
+            )
@@ -0,0 +1,39 @@
+from django.test import TestCase
+from django.http import Http404
+
+from tests.models import TargetModel
+from tests.views import NestedForeignKeySourceModelViewSet
+
+
+class ParentObjectMemoizationTest(TestCase):
+    def test_parent_object_is_only_fetched_once(self):
+        target = TargetModel.objects.create()
+        view = NestedForeignKeySourceModelViewSet(kwargs={'target_pk': target.pk})
+
+        with self.assertNumQueries(1):
+            parent_a = view.get_parent_object()
+            parent_b = view.get_parent_object()
+            view.get_queryset()
+
+        self.assertEqual(parent_a, target)
+        self.assertIs(parent_a, parent_b)
+
+    def test_parent_object_is_refetched_when_kwargs_change(self):
+        target_a = TargetModel.objects.create()
+        target_b = TargetModel.objects.create()
+        view = NestedForeignKeySourceModelViewSet(kwargs={'target_pk': target_a.pk})
+
+        self.assertEqual(view.get_parent_object(), target_a)
+
+        view.kwargs = {'target_pk': target_b.pk}
+        with self.assertNumQueries(1):
+            self.assertEqual(view.get_parent_object(), target_b)
+
+    def test_missing_parent_is_not_remembered(self):
+        view = NestedForeignKeySourceModelViewSet(kwargs={'target_pk': 1234})
+
+        with self.assertRaises(Http404):
+            view.get_parent_object()
+
+        target = TargetModel.objects.create(pk=1234)
+        self.assertEqual(view.get_parent_object(), target)
@@ -0,0 +1,54 @@
+from django.test import TestCase
+
+import mock
+
+from drf_nested_resource import utils
+from drf_nested_resource.relationships import ParentRelationship
+
+from tests.models import (
+    TargetModel,
+    ForeignKeySourceModel,
+)
+from tests.views import NestedForeignKeySourceModelViewSet
+
+
+class ParentRelationshipTest(TestCase):
+    def test_relationship_is_shared_between_view_instances(self):
+        """
+        Test that every instance of a view class (one per request) uses the
+        same `ParentRelationship`.
+        """
+        view_a = NestedForeignKeySourceModelViewSet()
+        view_b = NestedForeignKeySourceModelViewSet()
+
+        self.assertIs(
+            view_a.get_parent_relationship(),
+            view_b.get_parent_relationship(),
+        )
+
+    def test_discovery_only_runs_once(self):
+        """
+        Test that the relationship discovery functions are only called the
+        first time the information is needed.
+        """
+        relationship = ParentRelationship(
+            parent_model=TargetModel,
+            child_model=ForeignKeySourceModel,
+        )
+        with mock.patch.object(
+            utils, 'find_child_to_parent_accessor_name',
+            wraps=utils.find_child_to_parent_accessor_name,
+        ) as find_accessor_name:
+            self.assertEqual(relationship.accessor_name, 'target')
+            self.assertEqual(relationship.accessor_name, 'target')
+            self.assertEqual(relationship.lookup_field, 'pk')
+
+        self.assertEqual(find_accessor_name.call_count, 1)
+
+    def test_relationship_values(self):
+        relationship = ParentRelationship(
+            parent_model=TargetModel,
+            child_model=ForeignKeySourceModel,
+        )
+        self.assertEqual(relationship.url_kwarg, 'target_pk')
+        self.assertEqual(relationship.manager_attr, 'sources')
@@ -0,0 +1,142 @@
+import mock
+
+from django.test import TestCase
+from django.core.urlresolvers import reverse
+
+from rest_framework import serializers, status
+
+from drf_nested_resource import utils
+from drf_nested_resource.utils import find_serializer_related_lookups
+
+from tests.models import (
+    TargetModel,
+    ForeignKeySourceModel,
+    ManyToManyTargetModel,
+    ManyToManySourceModel,
+    MeterModel,
+)
+from tests.views import (
+    NestedForeignKeySourceModelViewSet,
+    NestedManyToManySourceModelViewSet,
+)
+
+
+class PrimaryKeySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ForeignKeySourceModel
+        fields = ('id', 'target')
+
+
+class NestedDepthSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = MeterModel
+        depth = 2
+
+
+class ManyToManySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ManyToManySourceModel
+
+
+class ReverseRelationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TargetModel
+        fields = ('id', 'sources')
+
+
+class SlugRelatedSerializer(serializers.ModelSerializer):
+    site_name = serializers.SlugRelatedField(
+        source='site', slug_field='pk', read_only=True,
+    )
+
+    class Meta:
+        model = MeterModel
+        fields = ('id', 'site_name')
+
+
+class FindSerializerRelatedLookupsTest(TestCase):
+    def test_primary_key_fields_need_no_lookups(self):
+        self.assertEqual(
+            find_serializer_related_lookups(PrimaryKeySerializer),
+            ((), ()),
+        )
+
+    def test_nested_foreign_key_is_selected(self):
+        self.assertEqual(
+            find_serializer_related_lookups(NestedDepthSerializer),
+            (('site',), ()),
+        )
+
+    def test_many_to_many_is_prefetched(self):
+        self.assertEqual(
+            find_serializer_related_lookups(ManyToManySerializer),
+            ((), ('targets',)),
+        )
+
+    def test_reverse_relation_is_prefetched(self):
+        self.assertEqual(
+            find_serializer_related_lookups(ReverseRelationSerializer),
+            ((), ('sources',)),
+        )
+
+    def test_declared_related_field_uses_source(self):
+        self.assertEqual(
+            find_serializer_related_lookups(SlugRelatedSerializer),
+            (('site',), ()),
+        )
+
+
+class ExplicitLookupsViewSet(NestedForeignKeySourceModelViewSet):
+    child_select_related = ('target',)
+    child_prefetch_related = ()
+
+
+class ChildQuerysetOptimizationTest(TestCase):
+    def test_many_to_many_children_are_listed_without_n_plus_one(self):
+        target = ManyToManyTargetModel.objects.create()
+        for i in range(5):
+            source = ManyToManySourceModel.objects.create()
+            source.targets.add(target, ManyToManyTargetModel.objects.create())
+
+        url = reverse('nested-m2m-sources-list', kwargs={'target_pk': target.pk})
+        # The parent, the children and the prefetched targets.
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+
+        self.assertEqual(
+            response.status_code, status.HTTP_200_OK, msg=response.data,
+        )
+        self.assertEqual(len(response.data), 5)
+        for obj in response.data:
+            self.assertEqual(len(obj['targets']), 2)
+
+    def test_lookups_can_be_declared_on_view(self):
+        target = TargetModel.objects.create()
+        view = ExplicitLookupsViewSet(kwargs={'target_pk': target.pk})
+
+        self.assertEqual(view.get_child_related_lookups(), (('target',), ()))
+
+    def test_lookups_default_to_serializer_lookups(self):
+        target = ManyToManyTargetModel.objects.create()
+        view = NestedManyToManySourceModelViewSet(kwargs={'target_pk': target.pk})
+
+        self.assertEqual(
+            view.get_queryset()._prefetch_related_lookups, ['targets'],
+        )
+
+    def test_default_serializer_lookups_are_found_once_per_view_class(self):
+        class DefaultSerializerViewSet(NestedManyToManySourceModelViewSet):
+            pass
+
+        target = ManyToManyTargetModel.objects.create()
+        with mock.patch.object(
+            utils, 'find_serializer_related_lookups',
+            wraps=utils.find_serializer_related_lookups,
+        ) as find_lookups:
+            for i in range(2):
+                view = DefaultSerializerViewSet(kwargs={'target_pk': target.pk})
+                self.assertEqual(
+                    view.get_child_related_lookups(), ((), ('targets',)),
+                )
+
+        self.assertEqual(find_lookups.call_count, 1)
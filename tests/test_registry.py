@@ -0,0 +1,59 @@
+from django.test import TestCase
+from django.core.exceptions import ImproperlyConfigured
+
+from rest_framework import viewsets
+from rest_framework.routers import SimpleRouter
+
+from drf_nested_resource.mixins import NestedResourceMixin
+from drf_nested_resource.registry import RelationshipRegistry
+
+from tests.models import (
+    TargetModel,
+    ForeignKeySourceModel,
+)
+from tests.urls import router
+from tests.views import NestedForeignKeySourceModelViewSet
+
+
+class UnrelatedModelsViewSet(NestedResourceMixin, viewsets.ModelViewSet):
+    parent_model = ForeignKeySourceModel
+    model = TargetModel
+
+
+class RelationshipRegistryTest(TestCase):
+    def test_relationships_are_shared_between_views(self):
+        registry = RelationshipRegistry()
+        self.assertIs(
+            registry.get(TargetModel, ForeignKeySourceModel),
+            registry.get(TargetModel, ForeignKeySourceModel),
+        )
+        self.assertEqual(len(registry), 1)
+
+    def test_register_router_resolves_relationships(self):
+        """
+        Test that registering a router resolves the relationship of every
+        nested view so no request has to.
+        """
+        RelationshipRegistry().register_router(router)
+
+        relationship = NestedForeignKeySourceModelViewSet().get_parent_relationship()
+        self.assertEqual(relationship.__dict__['accessor_name'], 'target')
+        self.assertEqual(relationship.__dict__['manager_attr'], 'sources')
+
+    def test_unrelated_models_raise_at_registration(self):
+        bad_router = SimpleRouter()
+        bad_router.register(
+            'sources/(?P<source_pk>\d+)/targets',
+            UnrelatedModelsViewSet, 'unrelated',
+        )
+        with self.assertRaises(ImproperlyConfigured):
+            RelationshipRegistry().register_router(bad_router)
+
+    def test_missing_url_kwarg_raises_at_registration(self):
+        bad_router = SimpleRouter()
+        bad_router.register(
+            'targets/(?P<pk>\d+)/sources',
+            NestedForeignKeySourceModelViewSet, 'missing-kwarg',
+        )
+        with self.assertRaises(ImproperlyConfigured):
+            RelationshipRegistry().register_router(bad_router)
@@ -0,0 +1,46 @@
+from django.test import TestCase
+from django.http import QueryDict
+
+from tests.models import TargetModel
+from tests.views import NestedForeignKeySourceModelViewSet
+
+
+class ParentReferenceInjectionTest(TestCase):
+    """
+    Test that `get_serializer` adds the reference to the parent to the data
+    without modifying or duplicating the data that was passed in.
+    """
+    def setUp(self):
+        self.target = TargetModel.objects.create()
+        self.view = NestedForeignKeySourceModelViewSet(
+            kwargs={'target_pk': self.target.pk},
+            request=None,
+            format_kwarg=None,
+        )
+
+    def test_dict_data(self):
+        nested = [{'value': i} for i in range(10)]
+        data = {'nested': nested}
+
+        serializer = self.view.get_serializer(data=data)
+
+        self.assertEqual(serializer.init_data['target'], self.target.pk)
+        self.assertIs(serializer.init_data['nested'], nested)
+        self.assertNotIn('target', data)
+
+    def test_query_dict_data(self):
+        data = QueryDict('foo=1&foo=2')
+
+        serializer = self.view.get_serializer(data=data)
+
+        self.assertIsInstance(serializer.init_data, QueryDict)
+        self.assertEqual(serializer.init_data['target'], self.target.pk)
+        self.assertEqual(serializer.init_data.getlist('foo'), ['1', '2'])
+        self.assertNotIn('target', data)
+
+    def test_data_with_parent_reference_is_not_copied(self):
+        data = {'target': str(self.target.pk)}
+
+        serializer = self.view.get_serializer(data=data)
+
+        self.assertIs(serializer.init_data, data)
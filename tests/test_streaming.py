@@ -0,0 +1,61 @@
+import json
+
+from django.test import TestCase
+from django.core.urlresolvers import reverse
+
+from rest_framework import status
+
+from tests.models import (
+    TargetModel,
+    ForeignKeySourceModel,
+)
+
+
+class StreamingListTest(TestCase):
+    def get_streamed_data(self, response):
+        self.assertTrue(response.streaming)
+        return json.loads(b''.join(response.streaming_content).decode('utf-8'))
+
+    def test_children_are_streamed_in_chunks(self):
+        target = TargetModel.objects.create()
+        sources = [ForeignKeySourceModel.objects.create(target=target) for _ in range(5)]
+        ForeignKeySourceModel.objects.create(target=TargetModel.objects.create())
+        url = reverse('streaming-sources-list', kwargs={'target_pk': target.pk})
+
+        # One query for the parent and one per chunk of two children.
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+            data = self.get_streamed_data(response)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(
+            [child['id'] for child in data], [source.pk for source in sources],
+        )
+
+    def test_full_last_chunk_ends_with_an_empty_query(self):
+        target = TargetModel.objects.create()
+        for _ in range(4):
+            ForeignKeySourceModel.objects.create(target=target)
+        url = reverse('streaming-sources-list', kwargs={'target_pk': target.pk})
+
+        response = self.client.get(url)
+
+        self.assertEqual(len(self.get_streamed_data(response)), 4)
+
+    def test_empty_list_is_valid_json(self):
+        target = TargetModel.objects.create()
+        url = reverse('streaming-sources-list', kwargs={'target_pk': target.pk})
+
+        response = self.client.get(url)
+
+        self.assertEqual(self.get_streamed_data(response), [])
+
+    def test_404_when_parent_does_not_exist(self):
+        url = reverse('streaming-sources-list', kwargs={'target_pk': 1234})
+
+        response = self.client.get(url)
+
+        self.assertEqual(
+            response.status_code, status.HTTP_404_NOT_FOUND, msg=response.data,
+        )
@@ -4,11 +4,18 @@ from django.core.exceptions import ImproperlyConfigured
 
 from rest_framework import serializers
 
+import mock
+
 from drf_nested_resource.utils import (
     find_child_to_parent_accessor_name,
     find_child_to_parent_serializer_field,
+    find_child_to_parent_query_name,
     compute_default_url_kwarg_for_parent,
     find_parent_to_child_manager,
+    find_parent_to_child_manager_attr,
+    get_serializer_field_names,
+    get_relation_index,
+    clear_relation_caches,
 )
 
 from tests.models import (
@@ -278,3 +285,174 @@ class GetParentToChildManagerTest(TestCase):
             child_model=SelfReferencingManyToManyModel,
         )
         self.assertManagersEqual(manager, parent_obj.targets)
+
+
+class FindParentToChildManagerAttrTest(TestCase):
+    """
+    Test that the `find_parent_to_child_manager_attr` function is able to find
+    the name of the manager attribute from the parent model without needing a
+    parent instance.
+    """
+    def test_foreign_key_relationship(self):
+        manager_attr = find_parent_to_child_manager_attr(
+            parent_model=TargetModel,
+            child_model=ForeignKeySourceModel,
+        )
+        self.assertEqual(manager_attr, 'sources')
+
+    def test_generic_foreign_key_relationship(self):
+        manager_attr = find_parent_to_child_manager_attr(
+            parent_model=TargetModel,
+            child_model=GenericForeignKeySourceModel,
+        )
+        self.assertEqual(manager_attr, 'generic_sources')
+
+    def test_many_to_many_relationship_from_other_side(self):
+        manager_attr = find_parent_to_child_manager_attr(
+            parent_model=ManyToManySourceModel,
+            child_model=ManyToManyTargetModel,
+        )
+        self.assertEqual(manager_attr, 'targets')
+
+
+class FindChildToParentQueryNameTest(TestCase):
+    """
+    Test that the `find_child_to_parent_query_name` function returns the name
+    used to traverse from the child model to the parent model in lookups.
+    """
+    def test_foreign_key_relationship(self):
+        query_name = find_child_to_parent_query_name(
+            parent_model=TargetModel,
+            child_model=ForeignKeySourceModel,
+        )
+        self.assertEqual(query_name, 'target')
+
+    def test_generic_foreign_key_relationship(self):
+        query_name = find_child_to_parent_query_name(
+            parent_model=TargetModel,
+            child_model=GenericForeignKeySourceModel,
+        )
+        self.assertIsNone(query_name)
+
+    def test_many_to_many_relationship(self):
+        query_name = find_child_to_parent_query_name(
+            parent_model=ManyToManyTargetModel,
+            child_model=ManyToManySourceModel,
+        )
+        self.assertEqual(query_name, 'targets')
+
+    def test_many_to_many_relationship_from_other_side(self):
+        query_name = find_child_to_parent_query_name(
+            parent_model=ManyToManySourceModel,
+            child_model=ManyToManyTargetModel,
+        )
+        self.assertEqual(query_name, 'sources')
+
+    def test_many_to_many_relationship_from_other_side_without_related_name(self):
+        query_name = find_child_to_parent_query_name(
+            parent_model=ManyToManySourceNoRelatedNameModel,
+            child_model=ManyToManyTargetModel,
+        )
+        self.assertEqual(query_name, 'manytomanysourcenorelatednamemodel')
+
+
+class UninstantiableSerializer(serializers.ModelSerializer):
+    def __init__(self, *args, **kwargs):
+        raise AssertionError("The serializer should not be instantiated")
+
+    class Meta:
+        model = ForeignKeySourceModel
+
+
+class ExcludedParentSerializer(serializers.ModelSerializer):
+    target_id = serializers.Field()
+
+    class Meta:
+        model = ForeignKeySourceModel
+        exclude = ('target',)
+
+
+class CustomGetFieldsSerializer(serializers.ModelSerializer):
+    def get_fields(self):
+        fields = super(CustomGetFieldsSerializer, self).get_fields()
+        fields['target_id'] = fields.pop('target')
+        return fields
+
+    class Meta:
+        model = ForeignKeySourceModel
+
+
+class GetSerializerFieldNamesTest(TestCase):
+    def test_serializer_is_not_instantiated(self):
+        """
+        Test that the fields are determined from the serializer class without
+        creating an instance of it.
+        """
+        field_name = find_child_to_parent_serializer_field(
+            UninstantiableSerializer,
+            'target',
+        )
+        self.assertEqual(field_name, 'target')
+
+    def test_matches_fields_of_serializer_instance(self):
+        for serializer_class in (NoSuffixSerializer, WithSuffixSerializer,
+                                 InheritedSerializer, ExcludedParentSerializer):
+            self.assertEqual(
+                get_serializer_field_names(serializer_class),
+                frozenset(serializer_class().get_fields()),
+            )
+
+    def test_excluded_field(self):
+        field_name = find_child_to_parent_serializer_field(
+            ExcludedParentSerializer,
+            'target',
+        )
+        self.assertEqual(field_name, 'target_id')
+
+    def test_custom_get_fields_is_respected(self):
+        field_name = find_child_to_parent_serializer_field(
+            CustomGetFieldsSerializer,
+            'target',
+        )
+        self.assertEqual(field_name, 'target_id')
+
+
+class RelationIndexTest(TestCase):
+    def setUp(self):
+        clear_relation_caches()
+
+    def test_index_of_model_relations(self):
+        index = get_relation_index(ForeignKeySourceModel)
+        self.assertEqual(
+            index.foreign_keys[TargetModel],
+            ForeignKeySourceModel._meta.get_field('target'),
+        )
+
+        index = get_relation_index(TargetModel)
+        generic_relation, = index.generic_relations
+        self.assertEqual(generic_relation.name, 'generic_sources')
+        self.assertEqual(
+            get_relation_index(GenericForeignKeySourceModel).find_generic_foreign_key(
+                generic_relation,
+            ).name,
+            'object',
+        )
+
+    def test_index_is_built_once_per_model(self):
+        self.assertIs(
+            get_relation_index(TargetModel),
+            get_relation_index(TargetModel),
+        )
+
+    def test_lookups_are_not_repeated(self):
+        find_child_to_parent_accessor_name(
+            parent_model=TargetModel,
+            child_model=ForeignKeySourceModel,
+        )
+        with mock.patch('drf_nested_resource.utils.get_relation_index') as get_index:
+            attname = find_child_to_parent_accessor_name(
+                parent_model=TargetModel,
+                child_model=ForeignKeySourceModel,
+            )
+        self.assertEqual(attname, 'target')
+        self.assertFalse(get_index.called)
@@ -0,0 +1,86 @@
+import json
+
+from django.test import TestCase
+from django.core.urlresolvers import reverse
+
+from rest_framework import status
+
+from tests.models import (
+    ManyToManyTargetModel,
+    ManyToManySourceModel,
+)
+
+
+class WritableManyToManyNestedResourceTest(TestCase):
+    def post_json(self, url, data):
+        return self.client.post(
+            url, json.dumps(data), content_type='application/json',
+        )
+
+    def test_created_child_is_linked_to_parent(self):
+        target = ManyToManyTargetModel.objects.create()
+        url = reverse('writable-m2m-sources-list', kwargs={'target_pk': target.pk})
+
+        response = self.post_json(url, {})
+
+        self.assertEqual(
+            response.status_code, status.HTTP_201_CREATED, msg=response.data,
+        )
+        self.assertEqual(response.data['targets'], [target.pk])
+        self.assertTrue(target.sources.filter(pk=response.data['id']).exists())
+
+    def test_children_are_attached_in_batches(self):
+        target = ManyToManyTargetModel.objects.create()
+        already_linked = ManyToManySourceModel.objects.create()
+        already_linked.targets.add(target)
+        sources = [ManyToManySourceModel.objects.create() for _ in range(3)]
+        url = reverse('writable-m2m-sources-attach', kwargs={'target_pk': target.pk})
+
+        pks = [already_linked.pk] + [source.pk for source in sources]
+        response = self.post_json(url, pks)
+
+        self.assertEqual(
+            response.status_code, status.HTTP_204_NO_CONTENT, msg=response.data,
+        )
+        self.assertEqual(
+            set(target.sources.values_list('pk', flat=True)), set(pks),
+        )
+
+    def test_attaching_missing_children_is_rejected(self):
+        target = ManyToManyTargetModel.objects.create()
+        source = ManyToManySourceModel.objects.create()
+        url = reverse('writable-m2m-sources-attach', kwargs={'target_pk': target.pk})
+
+        response = self.post_json(url, [source.pk, 1234])
+
+        self.assertEqual(
+            response.status_code, status.HTTP_400_BAD_REQUEST, msg=response.data,
+        )
+        self.assertFalse(target.sources.exists())
+
+    def test_children_are_detached_but_not_deleted(self):
+        target = ManyToManyTargetModel.objects.create()
+        other_target = ManyToManyTargetModel.objects.create()
+        sources = [ManyToManySourceModel.objects.create() for _ in range(3)]
+        for source in sources:
+            source.targets.add(target, other_target)
+        url = reverse('writable-m2m-sources-detach', kwargs={'target_pk': target.pk})
+
+        response = self.post_json(url, [source.pk for source in sources[:2]])
+
+        self.assertEqual(
+            response.status_code, status.HTTP_204_NO_CONTENT, msg=response.data,
+        )
+        self.assertEqual(list(target.sources.all()), [sources[2]])
+        self.assertEqual(other_target.sources.count(), 3)
+        self.assertEqual(ManyToManySourceModel.objects.count(), 3)
+
+    def test_404_when_parent_does_not_exist(self):
+        source = ManyToManySourceModel.objects.create()
+        url = reverse('writable-m2m-sources-attach', kwargs={'target_pk': 1234})
+
+        response = self.post_json(url, [source.pk])
+
+        self.assertEqual(
+            response.status_code, status.HTTP_404_NOT_FOUND, msg=response.data,
+        )
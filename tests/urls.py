@@ -1,9 +1,9 @@
-from rest_framework.routers import SimpleRouter
+from drf_nested_resource.routers import NestedResourceRouter
 
 from . import views
 
 
-router = SimpleRouter()
+router = NestedResourceRouter()
 router.register(
     'targets/(?P<target_pk>\d+)/sources',
     views.NestedForeignKeySourceModelViewSet, 'nested-sources',
@@ -20,5 +20,69 @@ router.register(
     'm2m-sources/(?P<source_pk>\d+)/m2m-targets',
     views.NestedManyToManyTargetModelViewSet, 'nested-m2m-targets',
 )
+router.register(
+    'targets/(?P<target_pk>\d+)/joined-sources',
+    views.JoinedNestedForeignKeySourceModelViewSet, 'joined-sources',
+)
+router.register(
+    'targets/(?P<target_model_pk>\d+)/joined-generic-sources',
+    views.JoinedNestedGenericForeignKeySourceModelViewSet, 'joined-generic-sources',
+)
+router.register(
+    'm2m-sources/(?P<source_pk>\d+)/joined-m2m-targets',
+    views.JoinedNestedManyToManyTargetModelViewSet, 'joined-m2m-targets',
+)
+router.register(
+    'targets/(?P<target_pk>\d+)/bulk-sources',
+    views.BulkNestedForeignKeySourceModelViewSet, 'bulk-sources',
+)
+router.register(
+    'm2m-targets/(?P<target_pk>\d+)/bulk-m2m-sources',
+    views.BulkNestedManyToManySourceModelViewSet, 'bulk-m2m-sources',
+)
+router.register(
+    'organizations/(?P<organization_pk>\d+)/sites/(?P<site_pk>\d+)/meters',
+    views.NestedMeterModelViewSet, 'nested-meters',
+)
+router.register(
+    'm2m-targets/(?P<target_pk>\d+)/writable-m2m-sources',
+    views.WritableNestedManyToManySourceModelViewSet, 'writable-m2m-sources',
+)
+router.register(
+    'targets/(?P<target_pk>\d+)/keyset-sources',
+    views.KeysetNestedForeignKeySourceModelViewSet, 'keyset-sources',
+)
+router.register(
+    'targets/(?P<target_model_pk>\d+)/keyset-generic-sources',
+    views.KeysetNestedGenericForeignKeySourceModelViewSet, 'keyset-generic-sources',
+)
+router.register(
+    'm2m-targets/(?P<target_pk>\d+)/keyset-m2m-sources',
+    views.KeysetNestedManyToManySourceModelViewSet, 'keyset-m2m-sources',
+)
+router.register(
+    'targets/(?P<target_pk>\d+)/streaming-sources',
+    views.StreamingNestedForeignKeySourceModelViewSet, 'streaming-sources',
+)
+router.register(
+    'targets/(?P<target_pk>\d+)/aggregate-sources',
+    views.AggregateNestedForeignKeySourceModelViewSet, 'aggregate-sources',
+)
+router.register(
+    'targets/(?P<target_pk>\d+)/bulk-aggregate-sources',
+    views.BulkAggregateNestedForeignKeySourceModelViewSet, 'bulk-aggregate-sources',
+)
+router.register(
+    'targets/(?P<target_pk>\d+)/conditional-sources',
+    views.ConditionalNestedTimestampedSourceModelViewSet, 'conditional-sources',
+)
+router.register(
+    'targets/(?P<target_pk>\d+)/instrumented-sources',
+    views.InstrumentedNestedForeignKeySourceModelViewSet, 'instrumented-sources',
+)
+router.register(
+    'targets/(?P<target_pk>\d+)/concurrent-sources',
+    views.ConcurrentNestedForeignKeySourceModelViewSet, 'concurrent-sources',
+)
 
 urlpatterns = router.urls
@@ -1,13 +1,32 @@
+from django.db.models import Max
+
 from rest_framework import viewsets
 
-from drf_nested_resource.mixins import NestedResourceMixin
+from drf_nested_resource.mixins import (
+    NestedResourceMixin,
+    BulkCreateNestedResourceMixin,
+    BulkUpdateDestroyNestedResourceMixin,
+    ManyToManyNestedResourceMixin,
+    StreamingListNestedResourceMixin,
+    AggregateNestedResourceMixin,
+    ConditionalNestedResourceMixin,
+    PARENT_LOOKUP_JOIN,
+    PARENT_LOOKUP_CONCURRENT,
+)
+from drf_nested_resource.pagination import KeysetPaginationMixin
+from drf_nested_resource.cache import ChildAggregateCache
+from drf_nested_resource.instrumentation import InstrumentedNestedResourceMixin
 
 from .models import (
     TargetModel,
     ForeignKeySourceModel,
+    TimestampedSourceModel,
     ManyToManyTargetModel,
     ManyToManySourceModel,
     GenericForeignKeySourceModel,
+    OrganizationModel,
+    SiteModel,
+    MeterModel,
 )
 
 
@@ -44,3 +63,179 @@ class NestedManyToManyTargetModelViewSet(NestedResourceMixin,
     """
     parent_model = ManyToManySourceModel
     model = ManyToManyTargetModel
+
+
+class JoinedNestedForeignKeySourceModelViewSet(NestedResourceMixin,
+                                              viewsets.ReadOnlyModelViewSet):
+    """
+    /targets/<target_pk>/joined-sources/
+    """
+    parent_model = TargetModel
+    model = ForeignKeySourceModel
+    parent_lookup_strategy = PARENT_LOOKUP_JOIN
+
+
+class JoinedNestedGenericForeignKeySourceModelViewSet(NestedResourceMixin,
+                                                      viewsets.ReadOnlyModelViewSet):
+    """
+    /targets/<target_model_pk>/joined-generic-sources/
+    """
+    parent_model = TargetModel
+    model = GenericForeignKeySourceModel
+    parent_lookup_strategy = PARENT_LOOKUP_JOIN
+
+
+class JoinedNestedManyToManyTargetModelViewSet(NestedResourceMixin,
+                                               viewsets.ReadOnlyModelViewSet):
+    """
+    /m2m-sources/<source_pk>/joined-m2m-targets/
+    """
+    parent_model = ManyToManySourceModel
+    model = ManyToManyTargetModel
+    parent_lookup_strategy = PARENT_LOOKUP_JOIN
+
+
+class BulkNestedForeignKeySourceModelViewSet(BulkCreateNestedResourceMixin,
+                                             BulkUpdateDestroyNestedResourceMixin,
+                                             NestedResourceMixin,
+                                             viewsets.ModelViewSet):
+    """
+    /targets/<target_pk>/bulk-sources/
+    """
+    parent_model = TargetModel
+    model = ForeignKeySourceModel
+    bulk_create_batch_size = 2
+
+
+class BulkNestedManyToManySourceModelViewSet(BulkCreateNestedResourceMixin,
+                                             BulkUpdateDestroyNestedResourceMixin,
+                                             NestedResourceMixin,
+                                             viewsets.ModelViewSet):
+    """
+    /m2m-targets/<target_pk>/bulk-m2m-sources/
+    """
+    parent_model = ManyToManyTargetModel
+    model = ManyToManySourceModel
+
+
+class NestedMeterModelViewSet(NestedResourceMixin, viewsets.ModelViewSet):
+    """
+    /organizations/<organization_pk>/sites/<site_pk>/meters/
+    """
+    parent_model = SiteModel
+    ancestor_models = (OrganizationModel,)
+    model = MeterModel
+
+
+class WritableNestedManyToManySourceModelViewSet(ManyToManyNestedResourceMixin,
+                                                 NestedResourceMixin,
+                                                 viewsets.ModelViewSet):
+    """
+    /m2m-targets/<target_pk>/writable-m2m-sources/
+    """
+    parent_model = ManyToManyTargetModel
+    model = ManyToManySourceModel
+    m2m_batch_size = 2
+
+
+class KeysetNestedForeignKeySourceModelViewSet(KeysetPaginationMixin,
+                                               NestedResourceMixin,
+                                               viewsets.ReadOnlyModelViewSet):
+    """
+    /targets/<target_pk>/keyset-sources/
+    """
+    parent_model = TargetModel
+    model = ForeignKeySourceModel
+    paginate_by = 2
+
+
+class KeysetNestedGenericForeignKeySourceModelViewSet(KeysetPaginationMixin,
+                                                      NestedResourceMixin,
+                                                      viewsets.ReadOnlyModelViewSet):
+    """
+    /targets/<target_model_pk>/keyset-generic-sources/
+    """
+    parent_model = TargetModel
+    model = GenericForeignKeySourceModel
+    paginate_by = 2
+
+
+class KeysetNestedManyToManySourceModelViewSet(KeysetPaginationMixin,
+                                               NestedResourceMixin,
+                                               viewsets.ReadOnlyModelViewSet):
+    """
+    /m2m-targets/<target_pk>/keyset-m2m-sources/
+    """
+    parent_model = ManyToManyTargetModel
+    model = ManyToManySourceModel
+    paginate_by = 2
+
+
+class StreamingNestedForeignKeySourceModelViewSet(StreamingListNestedResourceMixin,
+                                                  NestedResourceMixin,
+                                                  viewsets.ReadOnlyModelViewSet):
+    """
+    /targets/<target_pk>/streaming-sources/
+    """
+    parent_model = TargetModel
+    model = ForeignKeySourceModel
+    stream_chunk_size = 2
+
+
+class AggregateNestedForeignKeySourceModelViewSet(AggregateNestedResourceMixin,
+                                                  NestedResourceMixin,
+                                                  viewsets.ReadOnlyModelViewSet):
+    """
+    /targets/<target_pk>/aggregate-sources/
+    """
+    parent_model = TargetModel
+    model = ForeignKeySourceModel
+    child_aggregates = {'last_name': Max('name')}
+    child_aggregate_cache = ChildAggregateCache()
+
+
+class BulkAggregateNestedForeignKeySourceModelViewSet(AggregateNestedResourceMixin,
+                                                      BulkCreateNestedResourceMixin,
+                                                      BulkUpdateDestroyNestedResourceMixin,
+                                                      NestedResourceMixin,
+                                                      viewsets.ModelViewSet):
+    """
+    /targets/<target_pk>/bulk-aggregate-sources/
+    """
+    parent_model = TargetModel
+    model = ForeignKeySourceModel
+    child_aggregates = {'last_name': Max('name')}
+    child_aggregate_cache = ChildAggregateCache()
+
+
+class ConditionalNestedTimestampedSourceModelViewSet(ConditionalNestedResourceMixin,
+                                                     BulkUpdateDestroyNestedResourceMixin,
+                                                     NestedResourceMixin,
+                                                     viewsets.ModelViewSet):
+    """
+    /targets/<target_pk>/conditional-sources/
+    """
+    parent_model = TargetModel
+    model = TimestampedSourceModel
+    last_modified_field = 'updated_at'
+
+
+class InstrumentedNestedForeignKeySourceModelViewSet(InstrumentedNestedResourceMixin,
+                                                     NestedResourceMixin,
+                                                     viewsets.ModelViewSet):
+    """
+    /targets/<target_pk>/instrumented-sources/
+    """
+    parent_model = TargetModel
+    model = ForeignKeySourceModel
+    server_timing = True
+
+
+class ConcurrentNestedForeignKeySourceModelViewSet(NestedResourceMixin,
+                                                   viewsets.ReadOnlyModelViewSet):
+    """
+    /targets/<target_pk>/concurrent-sources/
+    """
+    parent_model = TargetModel
+    model = ForeignKeySourceModel
+    parent_lookup_strategy = PARENT_LOOKUP_CONCURRENT